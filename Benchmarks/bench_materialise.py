@@ -0,0 +1,100 @@
+#!/bin/python3
+
+# compares the time and memory needed to write candidate files
+# with the kernel-side copies of iseqs_to_file and with buffered reads and writes in Python
+
+import sys
+import random
+import argparse
+import subprocess
+from time import perf_counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Code"))
+import minimise
+
+CHUNK_SIZE = 200_000_000 # bytes read at once by the buffered copy
+
+
+# writes a fasta file of nbrecords random sequences, of about size bytes in total
+def make_fasta(filename, size, nbrecords, width=60) :
+	random.seed(0)
+	line = "".join(random.choice("ACGT") for i in range(width))
+	with open(filename, 'w') as f :
+		for r in range(nbrecords) :
+			f.write(">record" + str(r) + "\n")
+			nblines = size // nbrecords // (width+1)
+			f.write((line + "\n") * nblines)
+
+
+# writes the sequences like iseqs_to_file, reading them in Python strings by chunks of CHUNK_SIZE
+def buffered_iseqs_to_file(iseqs, inputfilename, outputfilename) :
+	with open(inputfilename, 'rb') as inputfile, open(outputfilename, 'wb') as outputfile :
+		ordered_iseqs = sorted(list(iseqs), key=lambda x:x.begin_seq)
+		for (i, sp) in enumerate(ordered_iseqs) :
+			for (j, (begin, end)) in enumerate(sorted(sp.subseqs, key=lambda x:x[0])) :
+				if i != 0 or j != 0 :
+					outputfile.write(b"\n")
+				header = sp.header + ", position " + str(sp.lineindex.nucl_position(begin) + 1)
+				outputfile.write((">" + header + "\n").encode())
+				inputfile.seek(begin)
+				ic = begin
+				while ic < end :
+					data = inputfile.read(min(CHUNK_SIZE, end - ic))
+					outputfile.write(data)
+					ic += len(data)
+
+
+# returns the peak resident memory of the process in MB, since the last reset_peak_memory
+def peak_memory() :
+	with open("/proc/self/status") as f :
+		for line in f :
+			if line.startswith("VmHWM:") :
+				return int(line.split()[1]) // 1024
+
+
+def reset_peak_memory() :
+	with open("/proc/self/clear_refs", 'w') as f :
+		f.write("5")
+
+
+# writes the candidate files with one method and prints the time and the peak memory
+def run_method(method, inputfilename, outputfilename, repeat) :
+	iseqs = minimise.parsing(inputfilename)
+	# keeps the central half of each sequence, like a reduction step
+	for sp in iseqs :
+		(begin, end) = sp.subseqs[0]
+		sp.subseqs = [(begin + (end-begin)//4, end - (end-begin)//4)]
+	
+	write = minimise.iseqs_to_file if method == "kernel" else buffered_iseqs_to_file
+	reset_peak_memory()
+	start = perf_counter()
+	for i in range(repeat) :
+		write(iseqs, inputfilename, outputfilename)
+	duration = perf_counter() - start
+	print(method, round(duration, 3), peak_memory(), sep="\t")
+
+
+if __name__=='__main__' :
+	parser = argparse.ArgumentParser(prog="bench_materialise")
+	parser.add_argument('-s', '--size', default=500, type=int, help="size of the fasta file in MB")
+	parser.add_argument('-n', '--records', default=4, type=int)
+	parser.add_argument('-r', '--repeat', default=5, type=int)
+	parser.add_argument('-d', '--dir', default=".", help="directory of the generated files")
+	parser.add_argument('--method', default=None, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	inputfilename = args.dir + "/bench_input.fasta"
+	outputfilename = args.dir + "/bench_output.fasta"
+	
+	if args.method is not None :
+		run_method(args.method, inputfilename, outputfilename, args.repeat)
+	
+	else :
+		make_fasta(inputfilename, args.size * 1_000_000, args.records)
+		print("method", "seconds", "peak RSS (MB)", sep="\t")
+		# each method in its own process to measure its own peak memory
+		for method in ["buffered", "kernel"] :
+			subprocess.run([sys.executable, __file__, "-d", args.dir, "-r", str(args.repeat), "--method", method])
+		Path(inputfilename).unlink()
+		Path(outputfilename).unlink()
@@ -0,0 +1,43 @@
+#!/bin/python3
+
+# oracles of the benchmarks, looking for the motifs planted by make_genome
+# they are called in the python workers of minimise.py with --oracle, or run as a command:
+# python3 bench_oracles.py <input> <motif,motif...> exits with 1 when all the motifs are in the input
+
+import os
+import sys
+import mmap
+
+
+# returns the fasta files of the input, a fasta file or a file of files
+def input_files(filename) :
+	with open(filename, 'rb') as f :
+		if f.read(1) == b">" :
+			return [filename]
+	with open(filename) as f :
+		return [line.strip() for line in f if line.strip() != ""]
+
+
+# returns True if all the motifs are in the files of the input
+# the motifs are planted inside a line, so they are found in the bytes of the files
+def has_motifs(filename, motifs=None) :
+	if motifs is None :
+		motifs = os.environ["BENCH_MOTIFS"].split(",")
+	missing = set(motif.encode() for motif in motifs)
+	for name in input_files(filename) :
+		if os.path.getsize(name) == 0 :
+			continue
+		with open(name, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm :
+			missing = set(motif for motif in missing if mm.find(motif) == -1)
+		if len(missing) == 0 :
+			return True
+	return False
+
+
+# zero-cost oracle: every input gives the desired output, measuring the cost of the minimiser alone
+def always(filename) :
+	return True
+
+
+if __name__=='__main__' :
+	sys.exit(1 if has_motifs(sys.argv[1], sys.argv[2].split(",")) else 0)
@@ -0,0 +1,124 @@
+#!/bin/python3
+
+# measures how the minimisation scales with the size of the input
+# generates inputs of increasing sizes with planted motifs, minimises them with several oracles
+# and records the wall time, the number of tests, the peak memory and the bytes written of each run
+
+import os
+import sys
+import json
+import shlex
+import argparse
+from subprocess import Popen
+from subprocess import PIPE
+from subprocess import STDOUT
+from time import perf_counter
+from tempfile import mkdtemp
+from shutil import rmtree
+from pathlib import Path
+
+import make_genome
+
+BENCHMARKS = Path(__file__).resolve().parent
+MINIMISE = str(BENCHMARKS.parent / "Code" / "minimise.py")
+ORACLES_FILE = str(BENCHMARKS / "bench_oracles.py")
+
+# name : (arguments of minimise.py after the input, arguments for a file of files, True if it looks for the motifs)
+# the commands are formatted with the input and the motifs, None if the oracle does not read this kind of input
+ORACLES = {
+	"motif" : ("python3 " + ORACLES_FILE + " {input} {motifs}|-r 1", "python3 " + ORACLES_FILE + " {input} {motifs}|-r 1", True),
+	"motif-oracle" : ("|--oracle " + ORACLES_FILE + ":has_motifs", "|--oracle " + ORACLES_FILE + ":has_motifs", True),
+	"always" : ("|--oracle " + ORACLES_FILE + ":always", "|--oracle " + ORACLES_FILE + ":always", False),
+	"e1" : ("python3 " + str(BENCHMARKS.parent / "Tests" / "e1.py") + " {input}|-r 1", "python3 " + str(BENCHMARKS.parent / "Tests" / "exe-fof.py") + " {input}|-r 1", False),
+	"many-patterns" : ("python3 " + str(BENCHMARKS.parent / "Data" / "exe-many-patterns.py") + " {input}|-r 1", None, False),
+}
+
+
+# returns the arguments of minimise.py running the oracle on the input, None if the oracle can not read it
+def oracle_args(oracle, inputname, motifs, nofof) :
+	template = ORACLES[oracle][0 if nofof else 1]
+	if template is None :
+		return None
+	(cmdline, options) = template.format(input=inputname, motifs=",".join(motifs)).split("|")
+	args = [inputname] + ([cmdline] if cmdline != "" else []) + options.split()
+	return args + ["-f"] if nofof else args
+
+
+# returns the number of nucleotides kept in the results, and True if they contain all the motifs
+def check_results(resultdir, motifs) :
+	kept = 0
+	contents = b""
+	for path in Path(resultdir).glob("*.fasta") :
+		data = path.read_bytes()
+		contents += data
+		kept += sum(len(line) for line in data.split(b"\n") if not line.startswith(b">"))
+	return (kept, all(motif.encode() in contents for motif in motifs))
+
+
+# runs minimise.py in its own directory and returns the measures of the run
+# the peak memory is the one of minimise.py and of the commands it ran, given by wait4
+def run_minimise(args, rundir, motifs) :
+	Path(rundir).mkdir()
+	env = dict(os.environ, BENCH_MOTIFS=",".join(motifs))
+	start = perf_counter()
+	p = Popen([sys.executable, MINIMISE] + args, cwd=rundir, env=env, stdout=PIPE, stderr=STDOUT)
+	output = p.stdout.read().decode(errors="replace")
+	(pid, status, rusage) = os.wait4(p.pid, 0)
+	duration = perf_counter() - start
+	p.returncode = os.waitstatus_to_exitcode(status)
+	p.stdout.close()
+
+	measures = {"seconds" : round(duration, 3), "peak RSS (MB)" : rusage.ru_maxrss // 1024, "returncode" : p.returncode}
+	for line in output.splitlines() :
+		if line.startswith("Process number : ") :
+			measures["runs"] = int(line.split(" : ")[1])
+		elif line.startswith("Bytes written : ") :
+			measures["bytes written"] = int(line.split(" : ")[1])
+	(measures["kept (nt)"], measures["motifs found"]) = check_results(Path(rundir) / "Results", motifs)
+	return measures
+
+
+if __name__=='__main__' :
+	parser = argparse.ArgumentParser(prog="bench_scaling")
+	parser.add_argument('-s', '--sizes', default="10k,100k,1M", help="numbers of nucleotides of the inputs, as 10k, 5M or 2G")
+	parser.add_argument('-n', '--records', default=8, type=int, help="number of sequences of each file")
+	parser.add_argument('-f', '--files', default=1, type=int, help="number of fasta files, listed in a file of files if more than one")
+	parser.add_argument('-m', '--motifs', default=2, type=int, help="number of motifs planted, all needed by the motif oracles")
+	parser.add_argument('--oracles', default="motif,motif-oracle,always,e1,many-patterns", help="oracles run, among " + ",".join(ORACLES))
+	parser.add_argument('-a', '--args', default="", help="other arguments of minimise.py, for example \"-j 4\"")
+	parser.add_argument('-d', '--dir', default=".", help="directory of the generated files and of the runs")
+	parser.add_argument('-o', '--output', default=None, help="json lines file where the measures are appended, to compare them between versions")
+	parser.add_argument('--seed', default=0, type=int)
+	args = parser.parse_args()
+
+	oracles = args.oracles.split(",")
+	for oracle in oracles :
+		if oracle not in ORACLES :
+			parser.error("Unknown oracle " + oracle + ", choose among " + ",".join(ORACLES) + ".")
+
+	workdir = mkdtemp(prefix="bench_scaling_", dir=args.dir)
+	motifs = make_genome.make_motifs(args.motifs, 20, args.seed)
+	columns = ["seconds", "runs", "peak RSS (MB)", "bytes written", "kept (nt)", "motifs found"]
+	print("size", "oracle", *columns, sep="\t")
+	try :
+		for size in args.sizes.split(",") :
+			inputdir = workdir + "/input_" + size
+			Path(inputdir).mkdir()
+			inputname = make_genome.make_genome(inputdir, make_genome.parse_size(size), args.records, args.files, motifs, args.seed)
+
+			for oracle in oracles :
+				minimise_args = oracle_args(oracle, inputname, motifs, args.files == 1)
+				if minimise_args is None :
+					print(size, oracle, "-", sep="\t")
+					continue
+				measures = run_minimise(minimise_args + shlex.split(args.args), workdir + "/run_" + size + "_" + oracle, motifs)
+				# only the motif oracles keep the motifs
+				if not ORACLES[oracle][2] :
+					measures["motifs found"] = "-"
+				print(size, oracle, *[measures.get(column, "-") for column in columns], sep="\t", flush=True)
+				if args.output is not None :
+					with open(args.output, 'a') as f :
+						f.write(json.dumps({"size" : size, "oracle" : oracle, "records" : args.records, "files" : args.files, "args" : args.args, **measures}) + "\n")
+			rmtree(inputdir)
+	finally :
+		rmtree(workdir)
@@ -0,0 +1,64 @@
+#!/bin/python3
+
+# compares the time needed to launch the command of a test and wait for its end
+# through the shell, with the arguments of the command without the shell, and with os.posix_spawn
+
+import os
+import sys
+import argparse
+import statistics
+from subprocess import Popen
+from subprocess import PIPE
+from time import perf_counter
+from tempfile import mkdtemp
+from shutil import rmtree
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Code"))
+import minimise
+
+
+# runs the command like a test of minimise.py, through the shell
+def run_shell(cmdline, dirname, env) :
+	p = Popen(cmdline, shell=True, cwd=dirname, env=env, stdout=PIPE, stderr=PIPE, start_new_session=True)
+	p.communicate()
+
+
+# runs the command like a test of minimise.py, without the shell
+def run_argv(cmdline, dirname, env) :
+	argv = minimise.command_argv(cmdline)
+	p = Popen(argv, executable=minimise.command_executable(argv), cwd=dirname, env=env, stdout=PIPE, stderr=PIPE, start_new_session=True)
+	p.communicate()
+
+
+# runs the command with os.posix_spawn, that can not change the directory of the process
+# the lower bound of the time needed to launch a process
+def run_posix_spawn(cmdline, dirname, env) :
+	argv = minimise.command_argv(cmdline)
+	pid = os.posix_spawn(minimise.command_executable(argv), argv, env, setsid=True)
+	os.waitpid(pid, 0)
+
+
+METHODS = {"shell" : run_shell, "argv" : run_argv, "posix_spawn" : run_posix_spawn}
+
+
+if __name__=='__main__' :
+	parser = argparse.ArgumentParser(prog="bench_spawn")
+	parser.add_argument('-c', '--command', default="true", help="command without shell syntax, run in each test")
+	parser.add_argument('-r', '--repeat', default=500, type=int)
+	args = parser.parse_args()
+
+	if minimise.command_argv(args.command) is None :
+		parser.error("The command needs the shell, it can not be run without it.")
+
+	dirname = mkdtemp(prefix="bench_spawn_")
+	env = dict(os.environ)
+	print("method", "mean (ms)", "median (ms)", sep="\t")
+	for (name, run) in METHODS.items() :
+		durations = list()
+		for i in range(args.repeat) :
+			start = perf_counter()
+			run(args.command, dirname, env)
+			durations.append((perf_counter() - start) * 1000)
+		print(name, round(statistics.mean(durations), 3), round(statistics.median(durations), 3), sep="\t")
+	rmtree(dirname)
@@ -0,0 +1,88 @@
+#!/bin/python3
+
+# generates synthetic fasta files, or a file of fasta files, of random nucleotides
+# with target motifs planted in them, each motif being inside a line of a sequence
+
+import os
+import random
+import argparse
+
+WIDTH = 60 # number of nucleotides by line
+BLOCK_LINES = 1 << 14 # number of lines generated at once
+NUCLEOTIDES = bytes.maketrans(bytes(range(256)), b"ACGT" * 64)
+
+
+# returns the number of nucleotides of a size given as 10k, 5M or 2G
+def parse_size(size) :
+	units = {"k" : 10**3, "M" : 10**6, "G" : 10**9}
+	if size[-1] in units :
+		return int(float(size[:-1]) * units[size[-1]])
+	return int(size)
+
+
+# returns nbmotifs random motifs of length nucleotides
+def make_motifs(nbmotifs, length, seed=0) :
+	rng = random.Random(seed)
+	return ["".join(rng.choice("ACGT") for i in range(length)) for j in range(nbmotifs)]
+
+
+# writes a fasta file of nbrecords random sequences with size nucleotides in total
+# motifs is a dict of the index of a record : motifs planted in it
+def write_fasta(filename, size, nbrecords, motifs, rng) :
+	with open(filename, 'wb') as f :
+		for r in range(nbrecords) :
+			f.write(b">record" + str(r).encode() + b"\n")
+			nblines = max(1, size // nbrecords // WIDTH)
+			# the line of each motif, and its column so that it does not cross the end of the line
+			planted = [(rng.randrange(nblines), rng.randrange(WIDTH - len(motif) + 1), motif.encode()) for motif in motifs.get(r, [])]
+
+			for first in range(0, nblines, BLOCK_LINES) :
+				nb = min(BLOCK_LINES, nblines - first)
+				block = bytearray(rng.randbytes(nb * WIDTH).translate(NUCLEOTIDES))
+				for (line, column, motif) in planted :
+					if first <= line < first + nb :
+						offset = (line - first) * WIDTH + column
+						block[offset:offset + len(motif)] = motif
+				f.write(b"\n".join(block[i:i + WIDTH] for i in range(0, len(block), WIDTH)) + b"\n")
+
+
+# writes the input of a benchmark in dirname: a fasta file if nbfiles is 1, else a file of nbfiles fasta files
+# each motif is planted in a record chosen at random among all the files
+# returns the path of the input
+def make_genome(dirname, size, nbrecords, nbfiles, motifs, seed=0) :
+	rng = random.Random(seed)
+	places = dict()
+	for motif in motifs :
+		(i, r) = (rng.randrange(nbfiles), rng.randrange(nbrecords))
+		places.setdefault(i, dict()).setdefault(r, []).append(motif)
+
+	filenames = list()
+	for i in range(nbfiles) :
+		filename = os.path.abspath(os.path.join(dirname, "genome" + str(i) + ".fasta"))
+		write_fasta(filename, size // nbfiles, nbrecords, places.get(i, dict()), rng)
+		filenames.append(filename)
+	if nbfiles == 1 :
+		return filenames[0]
+
+	fofname = os.path.abspath(os.path.join(dirname, "genome.txt"))
+	with open(fofname, 'w') as f :
+		f.write("\n".join(filenames))
+	return fofname
+
+
+if __name__=='__main__' :
+	parser = argparse.ArgumentParser(prog="make_genome")
+	parser.add_argument('-s', '--size', default="1M", help="number of nucleotides, as 10k, 5M or 2G")
+	parser.add_argument('-n', '--records', default=8, type=int, help="number of sequences of each file")
+	parser.add_argument('-f', '--files', default=1, type=int, help="number of fasta files, listed in a file of files if more than one")
+	parser.add_argument('-m', '--motifs', default=2, type=int, help="number of motifs planted")
+	parser.add_argument('-l', '--length', default=20, type=int, help="length of the motifs")
+	parser.add_argument('--seed', default=0, type=int)
+	parser.add_argument('-d', '--dir', default=".", help="directory of the generated files")
+	args = parser.parse_args()
+	if args.length > WIDTH :
+		parser.error("The motifs can not be longer than a line, " + str(WIDTH) + " nucleotides.")
+
+	motifs = make_motifs(args.motifs, args.length, args.seed)
+	print(make_genome(args.dir, parse_size(args.size), args.records, args.files, motifs, args.seed))
+	print(",".join(motifs))
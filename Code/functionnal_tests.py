@@ -2,11 +2,17 @@
 
 import subprocess
 import filecmp
+import json
 import sys
 from pathlib import Path
+from shutil import rmtree
 
 ABSOLUTE_PATH_TO_EXE = "/home/benoit/Documents/Stage-2023-Pasteur/Pasteur-Genome-Fuzzing/Tests/"
 #ABSOLUTE_PATH_TO_EXE = "/home/yoshihiro/Documents/Pasteur-Genome-Fuzzing/Tests/"
+STORE = "functionnal_tests.sqlite" # store made by a test and resumed by the next one, removed at the end
+LOG = "functionnal_tests.jsonl" # log made by a test and replayed by the next one, removed at the end
+TRACE = "functionnal_tests.json" # trace written by a test, removed at the end
+ADDRESS = "127.0.0.1:7719" # address of the coordinator of the test with a worker, started just before the worker
 
 def make_in_exe_out() :
     in_exe_out = [ \
@@ -41,7 +47,60 @@ def make_in_exe_out() :
     ( \
         "../Tests/t1.fasta", \
         "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e4.py ../Tests/t1.fasta\" -r 1 -f", \
-        "../Tests/t1_e4.fasta") \
+        "../Tests/t1_e4.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -e \"three times three same\" -f", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "--oracle " + ABSOLUTE_PATH_TO_EXE + "oracle_e1.py:three_times_three_same -f", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py /dev/stdin\" -r 1 -f --io stdin", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f --io fifo", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e6.py ../Tests/t1.fasta hang-done\" -r 1 -f -t 1", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e6.py ../Tests/t1.fasta hang-error\" -f -t 1 --timeout-desired", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e6.py ../Tests/t1.fasta child-done\" -r 1 -f -t 1", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f -s " + STORE, \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f -s " + STORE + " --resume", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "--simulate " + ABSOLUTE_PATH_TO_EXE + "t1_model.json -f", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f --log " + LOG, \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "--replay " + LOG + " -f", \
+        "../Tests/t1_e1.fasta"), \
+    ( \
+        "../Tests/t1.fasta", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f --listen " + ADDRESS + " & sleep 0.3; " + \
+        "./minimise.py ../Tests/t1.fasta \"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f -j 2 --worker " + ADDRESS + "; wait", \
+        "../Tests/t1_e1.fasta") \
     ]
     return in_exe_out
 
@@ -71,10 +130,20 @@ def make_fof_ex_out() :
         [("../Tests/fof3_expected.txt", "Results/fof3.txt"),
          ("../Tests/t4_fof3_expected.fasta", "Results/t4.fasta"), 
          ("../Tests/Toto/t4_fof3_expected.fasta", "Results/t4_1.fasta")
+        ]), \
+    ( \
+        "../Tests/fof1.txt", \
+        "\"python3 " + ABSOLUTE_PATH_TO_EXE + "exe-fof.py ../Tests/fof1.txt\" -r 1 --io fifo", \
+        [("../Tests/fof1_expected.txt", "Results/fof1.txt"),
+         ("../Tests/t3_fof1_expected.fasta", "Results/t3.fasta"), 
+         ("../Tests/t4_fof1_expected.fasta", "Results/t4.fasta")
         ]) \
     ]
     return fof_exe_out
 
+# the tests are run one after the other, then at once with speculation, chunks and concurrent reductions
+JOBS_OPTIONS = ["-j 1", "-j 4 -k 3"]
+
 EXTENSION = "_result"
 OKGREEN = '\033[92m'
 WARNING = '\033[93m'
@@ -94,6 +163,7 @@ class TestCmdData :
     def run(self, cmdbegin) :
         cmdline = self.buildcmd(cmdbegin)
         print(cmdline)
+        rmtree("Results", ignore_errors=True) # a failed run must not leave the results of the previous test
         subprocess.run(cmdline, shell=True)
 
     def output_correct(self) :
@@ -132,13 +202,14 @@ def test_fasta(cmdbegin, in_exe_out) :
         
         cmdline = cmdbegin + " " + input + " " + exe
         print(cmdline)
+        rmtree("Results", ignore_errors=True) # a failed run must not leave the results of the previous test
         subprocess.run(cmdline, shell=True)
 
         p = Path(input)
         #realoutput = str(p.parent) + "/" + p.stem + EXTENSION + p.suffix
         realoutput = "Results/" + p.name
         
-        if filecmp.cmp(expectedoutput, realoutput) :
+        if Path(realoutput).is_file() and filecmp.cmp(expectedoutput, realoutput) :
             print("Test réussi.\n")
             c += 1
         else : 
@@ -152,6 +223,29 @@ def test_fasta(cmdbegin, in_exe_out) :
         return False
 
 
+# runs e1.py on t1.fasta with --trace, the trace must load and have the spans of the tests
+def test_trace(cmdbegin) :
+    cmdline = cmdbegin + " ../Tests/t1.fasta \"python3 " + ABSOLUTE_PATH_TO_EXE + "e1.py ../Tests/t1.fasta\" -r 1 -f --trace " + TRACE
+    print(cmdline)
+    rmtree("Results", ignore_errors=True) # a failed run must not leave the results of the previous test
+    Path(TRACE).unlink(missing_ok=True)
+    subprocess.run(cmdline, shell=True)
+
+    try :
+        with open(TRACE) as f :
+            events = json.load(f)["traceEvents"]
+        spans = [event for event in events if event["name"] == "test" and event["cat"] == "test" and event["dur"] >= 0]
+    except (OSError, ValueError, KeyError) :
+        spans = []
+
+    if len(spans) != 0 and Path("Results/t1.fasta").is_file() and filecmp.cmp("../Tests/t1_e1.fasta", "Results/t1.fasta") :
+        print(OKGREEN + "Test of the trace réussi (" + str(len(spans)) + " tests).\n" + ENDC)
+        return True
+    else :
+        print(WARNING + "Test of the trace raté." + ENDC + "\n")
+        return False
+
+
 def printing_cmd(cmdbegin, in_exe_out, fof_exe_out) :
     for (input, exe, expectedoutput) in in_exe_out :
         cmdline = cmdbegin + " " + input + " " + exe
@@ -178,13 +272,20 @@ if __name__=='__main__' :
 
         if argc >= 3 and sys.argv[2] == "-n" :
 
-                printing_cmd(cmdbegin, in_exe_out, fof_exe_out)
+                for jobs in JOBS_OPTIONS :
+                    printing_cmd(cmdbegin + " " + jobs, in_exe_out, fof_exe_out)
                 exit(0)
         
         else :
             
-            test_fasta(cmdbegin, in_exe_out)
-            test_fof(cmdbegin, fof_exe_out)
+            for jobs in JOBS_OPTIONS :
+                print("Tests with " + jobs + "\n")
+                test_fasta(cmdbegin + " " + jobs, in_exe_out)
+                test_fof(cmdbegin + " " + jobs, fof_exe_out)
+                test_trace(cmdbegin + " " + jobs)
+            Path(STORE).unlink(missing_ok=True)
+            Path(TRACE).unlink(missing_ok=True)
+            Path(LOG).unlink(missing_ok=True)
 
     else :
         print("Arguments Error : ./functionnal_tests.py </path/to/Tests> [-n]")
@@ -1,25 +1,116 @@
 #!/bin/python3
 
-from time import sleep
 from pathlib import Path
 from subprocess import Popen
 from subprocess import PIPE
 from shutil import rmtree
-from shutil import copy as shutilcopy
-from multiprocessing import Pool
+from shutil import which
+from multiprocessing import Pipe
+from multiprocessing import get_context
+from multiprocessing import get_all_start_methods
+from contextlib import redirect_stdout
+from contextlib import redirect_stderr
+from functools import wraps
+from time import monotonic
+from bisect import bisect_left
+from array import array
+from collections import OrderedDict
+from collections import deque
+from copy import copy
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import mkdtemp
 import argparse
+import errno
+import fcntl
+import mmap
+import os
+import selectors
+import signal
+import stat
+import threading
+import sqlite3
+import json
+import shlex
+import importlib
+import importlib.util
+import io
+import sys
+import traceback
+import socket
+import base64
+import hashlib
 
 NB_PROCESS = 0
-CHUNK_SIZE = 200_000_000 # char number, string of about 0.8 Go
+BYTES_WRITTEN = 0 # number of bytes of sequences written in the files and streams of the tests
+BYTES_LOCK = threading.Lock() # held when BYTES_WRITTEN is increased, the streams are written by threads
+COPY_SIZE = 1 << 20 # number of bytes copied at once when the kernel can not copy them itself
+SCAN_SIZE = 1 << 24 # number of bytes of a mapped file copied at once when scanning it
+READ_SIZE = 1 << 16 # number of bytes read at once in the pipes of the processes
+OUTPUT_LIMIT = 1 << 20 # number of bytes kept from the beginning of stdout and stderr
+POLL_PERIOD = 0.01 # seconds between two checks of the processes when their end can not be awaited
+TIMEOUT_MIN = 1 # minimal number of seconds of the timeout computed from the duration of the first run
+CHECKPOINT_PERIOD = 10 # minimal number of seconds between two checkpoints
+FILE_CACHE_VERSIONS = 2 # number of versions of each input file kept by the FileCache
+FICLONE = 0x40049409 # ioctl making a reflink of a file on linux
+LINK_METHOD = "reflink" if sys.platform == "linux" else "hardlink" # first method tried by link_file
+COPY_METHOD = "copy_file_range" if hasattr(os, "copy_file_range") else "sendfile" if hasattr(os, "sendfile") else "read" # first method tried by copy_range
+TERMINATING_SIGNALS = (signal.SIGTERM, signal.SIGHUP) # signals ending the run after killing its tests
+ORACLE_CONTEXT = get_context("forkserver" if "forkserver" in get_all_start_methods() else "spawn") # starts the processes of the OracleWorkers
+SHELL_SYNTAX = "|&;<>()$`*?[]{}~#!\n" # characters of a command that only the shell can interpret
+
+
+# index of the line breaks inside the sequence of a specie, built once when parsing
+# converts the offsets in the file to positions in the sequence and back with a binary search
+# the first lines, when they have the same width, are indexed by this width only
+class LineIndex :
+
+	def __init__(self, begin_seq, breaks, width=0, nregular=0) :
+		self.begin_seq = begin_seq
+		self.width = width # number of nucleotides of the regular lines
+		self.nregular = nregular # number of regular lines at the beginning of the seq
+		self.breaks = breaks # array of the offsets of the '\n' after the regular lines, in ascending order
+	
+	# returns the number of line breaks of the regular lines before the offset
+	def regular_breaks_before(self, offset) :
+		if offset <= self.begin_seq + self.width :
+			return 0
+		return min(self.nregular, (offset - self.begin_seq - self.width - 1) // (self.width + 1) + 1)
+	
+	# returns the number of nucleotides of the sequence before the offset
+	def nucl_position(self, offset) :
+		return offset - self.begin_seq - self.regular_breaks_before(offset) - bisect_left(self.breaks, offset)
+	
+	# returns the offset in the file of the nucleotide at the position pos (starting from 0)
+	def file_offset(self, pos) :
+		if pos < self.width * self.nregular :
+			return self.begin_seq + pos + pos // self.width
+
+		# the nucleotide is after the i-th line break if there are at most pos nucleotides before it
+		imin = 0
+		imax = len(self.breaks)
+		while imin < imax :
+			imid = (imin+imax) // 2
+			if self.breaks[imid] - self.begin_seq - self.nregular - imid <= pos :
+				imin = imid + 1
+			else :
+				imax = imid
+		return self.begin_seq + pos + self.nregular + imin
 
 
 class SpecieData :
 	
-	def __init__(self, header, begin_seq, end_seq, filename) : # initialise the specie with one seq
+	def __init__(self, header, begin_seq, end_seq, filename, lineindex=None) : # initialise the specie with one seq
 		self.header = header # string of the specie name and comments
 		self.begin_seq = begin_seq # int, constant
 		self.subseqs = [(begin_seq, end_seq)] # int tuple list, variable represents the index of the first char of the seq in the file (included) and the index of the last one (excluded)
 		self.filename = filename # string filename
+		self.lineindex = lineindex if lineindex is not None else LineIndex(begin_seq, array('q')) # LineIndex of the seq
+	
+	# returns a copy of the specie with other subseqs
+	def with_subseqs(self, subseqs) :
+		sp = copy(self)
+		sp.subseqs = list(subseqs)
+		return sp
 	
 	def __str__(self) : # debug function
 		s = ">" + self.header + "\n"
@@ -27,9 +118,32 @@ class SpecieData :
 		return s
 
 
+# returns the arguments of the command line, or None if it needs the shell to be interpreted
+def command_argv(cmdline) :
+	if any(c in SHELL_SYNTAX for c in cmdline) :
+		return None
+	try :
+		argv = shlex.split(cmdline)
+	except ValueError :
+		return None
+	# a first word setting a variable is understood by the shell only
+	if len(argv) == 0 or "=" in argv[0] :
+		return None
+	return argv
+
+
+# returns the path of the program run by the arguments, None if it is not found, as the builtins of the shell
+# a relative path is left to the directory of the test
+def command_executable(argv) :
+	if "/" in argv[0] :
+		return argv[0]
+	return which(argv[0])
+
+
 class CmdArgs :
 
-	def __init__(self, subcmdline, infilename, nofof, outfilesnames, desired_output, verbose) :
+	# seqfilesnames are the names of the files of sequences, read in the fof when None
+	def __init__(self, subcmdline, infilename, nofof, outfilesnames, desired_output, verbose, seqfilesnames=None) :
 		self.subcmdline = subcmdline
 		self.infilename = infilename # the name of the fof or the only file of sequences
 		self.nofof = nofof
@@ -37,14 +151,31 @@ class CmdArgs :
 		self.desired_output = desired_output
 		self.seqfilesnames = []
 		self.verbose = verbose
-		self.init_seqfilesnames()
+		self.timeout = None # seconds before a test is interrupted, None for no limit
+		self.timeout_desired = False # True if a test interrupted by the timeout gives the desired output
+		self.jobs = 1 # number of tests run at once on this node
+		self.group_removal = True # True if the species are removed by groups, False if one by one
+		self.nbchunks = 2 # number of chunks a sequence is split in by reduce_specie
+		self.oracle = None # "module:function" or "path.py:function" called instead of the command, None to run the command
+		self.io = "file" # how the sequences are given to the command : "file", "stdin" or "fifo"
+		self.model = None # SimulatedOracle or ReplayedOracle giving the verdicts instead of the command, None to run the command
+		self.fingerprint = None # hash of the species parsed and of the desired output, the same on the coordinator and its workers
+		if seqfilesnames is None :
+			self.init_seqfilesnames()
+		else :
+			self.seqfilesnames = seqfilesnames
 		self.fileregister = self.make_fileregister(self.get_all_infiles() + self.outfilesnames)
 		self.subcmdline_replaced = self.replace_path_in_cmd(self.get_all_infiles() + self.outfilesnames)
+		self.argv = command_argv(self.subcmdline_replaced) # arguments of the command run without the shell, None if it needs the shell
+		self.executable = command_executable(self.argv) if self.argv is not None else None
+		if self.executable is None :
+			self.argv = None
+		self.env = dict(os.environ) # environment of the commands, copied once
 		print(self.fileregister)
 		print(self.subcmdline_replaced)
 	
 	def init_seqfilesnames(self) :
-		if nofof :
+		if self.nofof :
 			self.seqfilesnames = [self.infilename]
 		else :
 			self.seqfilesnames = fof_to_list(self.infilename)
@@ -73,13 +204,270 @@ class CmdArgs :
 		return fileregister
 			
 			
+class OutcomeCache :
+
+	def __init__(self) :
+		self.returncodes = dict() # key : returncode, the outputs are not kept in memory
+		self.verdicts = dict() # key : bool, True if the outcome is the desired output
+		self.hits = 0
+		self.store = None # OutcomeStore where the outcomes are also written
+	
+	# loads the verdicts of the store and writes the new outcomes in it
+	def attach(self, store) :
+		self.store = store
+		for (key, returncode, verdict) in store.load_outcomes() :
+			self.returncodes[key] = returncode
+			self.verdicts[key] = verdict
+	
+	def __contains__(self, key) :
+		return key in self.verdicts
+	
+	# returns the verdict of an already tested configuration, None if it has never been tested
+	def get_verdict(self, key) :
+		verdict = self.verdicts.get(key)
+		if verdict is not None :
+			self.hits += 1
+		return verdict
+	
+	def add(self, key, outcome, verdict) :
+		self.returncodes[key] = outcome[0]
+		self.verdicts[key] = verdict
+		if self.store is not None :
+			self.store.add_outcome(key, outcome, verdict)
+
+
+OUTCOME_CACHE = OutcomeCache()
+
+
+# progression of the reduction, saved in the checkpoints to resume a run
+class ReductionProgress :
+
+	def __init__(self) :
+		self.tested = set() # ids of the files and species whose removal has been tested and refused
+		self.files_removed = False # True once the files removal is done
+		self.removed_from = set() # filenames whose species removal is done
+		self.reduced = set() # ids of the species completely reduced
+		self.pending = dict() # id of a specie : its subseqs that remain to reduce
+	
+	# forgets the reduction of the specie, and the removal of the species of its file if removal
+	def forget(self, sp, removal) :
+		spid = (sp.filename, sp.begin_seq)
+		self.reduced.discard(spid)
+		self.pending.pop(spid, None)
+		if removal :
+			self.tested.discard(spid)
+			self.removed_from.discard(sp.filename)
+	
+	def to_json(self) :
+		return {
+			"tested" : [list(x) if isinstance(x, tuple) else x for x in self.tested],
+			"files_removed" : self.files_removed,
+			"removed_from" : list(self.removed_from),
+			"reduced" : [list(x) for x in self.reduced],
+			"pending" : [[list(spid), [list(seq) for seq in seqs]] for (spid, seqs) in self.pending.items()]
+		}
+	
+	def load_json(self, d) :
+		self.tested = set(tuple(x) if isinstance(x, list) else x for x in d["tested"])
+		self.files_removed = d["files_removed"]
+		self.removed_from = set(d["removed_from"])
+		self.reduced = set(tuple(x) for x in d["reduced"])
+		self.pending = dict((tuple(spid), [tuple(seq) for seq in seqs]) for (spid, seqs) in d["pending"])
+
+
+PROGRESS = ReductionProgress()
+STATE_LOCK = threading.RLock() # held when spbyfile or PROGRESS are copied or modified, as reductions may run at once
+
+
+# returns the [size, modification time] of each file, None for a file that does not exist as the simulated ones
+def files_stamp(filenames) :
+	stamps = list()
+	for filename in filenames :
+		try :
+			st = os.stat(filename)
+			stamps.append([st.st_size, st.st_mtime_ns])
+		except FileNotFoundError :
+			stamps.append(None)
+	return stamps
+
+
+# sqlite file where the outcomes of the tested configurations and the checkpoints of the reduction are kept
+class OutcomeStore :
+
+	def __init__(self, filename, cmdargs, resume) :
+		self.filename = filename
+		self.last_checkpoint = None # time of the last checkpoint
+		self.connection = sqlite3.connect(filename, check_same_thread=False) # the outcomes are added by the thread of the Scheduler
+		self.lock = threading.Lock()
+		self.connection.execute("CREATE TABLE IF NOT EXISTS run (description TEXT)")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS outcomes (key TEXT PRIMARY KEY, verdict INTEGER, returncode INTEGER, stdout BLOB, stderr BLOB)")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS checkpoint (id INTEGER PRIMARY KEY, state TEXT, progress TEXT)")
+
+		# the stored outcomes are only valid for the same command, inputs and desired output
+		# the contents of the inputs are checked by their species, and by the size and modification time of their files
+		description = json.dumps([cmdargs.subcmdline, cmdargs.oracle, cmdargs.infilename, cmdargs.nofof, cmdargs.seqfilesnames, list(cmdargs.desired_output), cmdargs.fingerprint, files_stamp(cmdargs.seqfilesnames)])
+		row = self.connection.execute("SELECT description FROM run").fetchone()
+		if resume :
+			if row is not None and row[0] != description :
+				raise ValueError("The store " + filename + " was made with another command, input or desired output.")
+		else :
+			self.connection.execute("DELETE FROM outcomes")
+			self.connection.execute("DELETE FROM checkpoint")
+		self.connection.execute("DELETE FROM run")
+		self.connection.execute("INSERT INTO run VALUES (?)", (description,))
+		self.connection.commit()
+	
+	# yields the (key, returncode, verdict) of the stored outcomes, without their outputs
+	def load_outcomes(self) :
+		for (jsonkey, verdict, returncode) in self.connection.execute("SELECT key, verdict, returncode FROM outcomes") :
+			yield (json_to_key(jsonkey), returncode, bool(verdict))
+	
+	def add_outcome(self, key, outcome, verdict) :
+		(returncode, stdout, stderr) = outcome
+		with self.lock :
+			self.connection.execute("INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?)", (json.dumps(key), int(verdict), returncode, stdout, stderr))
+			self.connection.commit()
+	
+	# saves the actual state and progression, at most once every CHECKPOINT_PERIOD seconds unless forced
+	def save_checkpoint(self, spbyfile, progress, force=False) :
+		now = monotonic()
+		if not force and self.last_checkpoint is not None and now - self.last_checkpoint < CHECKPOINT_PERIOD :
+			return None
+		self.last_checkpoint = now
+		state = [[[sp.filename, sp.begin_seq, sp.subseqs] for sp in iseqs] for iseqs in spbyfile]
+		with self.lock :
+			self.connection.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?, ?)", (json.dumps(state), json.dumps(progress.to_json())))
+			self.connection.commit()
+	
+	# returns the (state, progress as json) of the last checkpoint, None if there is none
+	def load_checkpoint(self) :
+		row = self.connection.execute("SELECT state, progress FROM checkpoint WHERE id = 0").fetchone()
+		if row is None :
+			return None
+		return (json.loads(row[0]), json.loads(row[1]))
+	
+	def close(self) :
+		self.connection.close()
+
+
+STORE = None # OutcomeStore of the run, None if the outcomes are not persisted
+
+
+def json_to_key(jsonkey) :
+	return list_to_key(json.loads(jsonkey))
+
+
+def list_to_key(config) :
+	return tuple((filename, begin_seq, tuple(tuple(seq) for seq in subseqs)) for (filename, begin_seq, subseqs) in config)
+
+
+# log of every test of the run, a line of json each
+# the first line describes the run, with the options that choose the configurations tested
+# the next ones give the configuration of a test, its verdict, the digests of its outputs and its times, in the order the tests end
+class RunLog :
+
+	def __init__(self, filename, cmdargs) :
+		self.origin = monotonic()
+		self.file = open(filename, 'w', buffering=1) # each line is written at once, to keep the tests of an interrupted run
+		self.lock = threading.Lock()
+		description = {"command" : cmdargs.subcmdline, "oracle" : cmdargs.oracle, "files" : cmdargs.seqfilesnames, "desired_output" : list(cmdargs.desired_output), "fingerprint" : cmdargs.fingerprint, "jobs" : cmdargs.jobs, "chunks" : cmdargs.nbchunks, "group_removal" : cmdargs.group_removal}
+		self.file.write(json.dumps({"run" : description}) + "\n")
+	
+	def add(self, job) :
+		(returncode, stdout, stderr) = job.outcome if job.outcome is not None else (None, b"", b"")
+		entry = {
+			"config" : job.key,
+			"state" : job.state,
+			"verdict" : job.verdict,
+			"returncode" : returncode,
+			"stdout_sha256" : hashlib.sha256(stdout).hexdigest(),
+			"stdout_bytes" : len(stdout),
+			"stderr_sha256" : hashlib.sha256(stderr).hexdigest(),
+			"stderr_bytes" : len(stderr),
+			"speculative" : job.speculative,
+			"stage" : job.stage,
+			"depth" : job.depth,
+			"submitted" : round(job.phases[0][1] - self.origin, 6),
+			"start" : round(job.start - self.origin, 6),
+			"duration" : round(job.end - job.start, 6)
+		}
+		with self.lock :
+			self.file.write(json.dumps(entry) + "\n")
+	
+	def close(self) :
+		self.file.close()
+
+
+RUN_LOG = None # RunLog of the run, None if the tests are not logged
+
+
+def save_checkpoint(spbyfile, force=False) :
+	if STORE is not None :
+		with STATE_LOCK :
+			STORE.save_checkpoint(spbyfile, PROGRESS, force)
+
+
+# rebuilds spbyfile as it was in the last checkpoint of the store, from the freshly parsed species
+def restore_checkpoint(spbyfile, store) :
+	checkpoint = store.load_checkpoint()
+	if checkpoint is None :
+		return spbyfile
+	(state, progress) = checkpoint
+	PROGRESS.load_json(progress)
+
+	species = dict()
+	for iseqs in spbyfile :
+		for sp in iseqs :
+			species[(sp.filename, sp.begin_seq)] = sp
+
+	restored = list()
+	for filestate in state :
+		iseqs = list()
+		for (filename, begin_seq, subseqs) in filestate :
+			sp = species[(filename, begin_seq)]
+			sp.subseqs = [tuple(seq) for seq in subseqs]
+			iseqs.append(sp)
+		restored.append(iseqs)
+	return restored
+
+
 class PopenExtended(Popen) :
 
 	def __init__(self, args, bufsize=-1, executable=None, stdin=None, stdout=None, stderr=None, preexec_fn=None, close_fds=True, shell=False, cwd=None, env=None, universal_newlines=None, startupinfo=None, creationflags=0, restore_signals=True, start_new_session=False, pass_fds=(), *, encoding=None, errors=None, text=None, prioritised=True) :
 		self.prioritised = prioritised # new attribute
+		self.killed = False # True if the process was interrupted before its end
+		self.decided = False # True if the process was interrupted because its output was already the desired one
+		self.timedout = False # True if the process was interrupted because it ran longer than the timeout
+		self.start = None # time when the process was launched
+		self.outcome = None # (returncode, stdout, stderr) once terminated
+		self.verdict = None # True if the outcome is the desired output, once terminated
+		self.buffers = None # OutputBuffer of stdout and stderr
+		self.openpipes = 0 # number of pipes not read until their end
 		super().__init__(args=args, bufsize=bufsize, executable=executable, stdin=stdin, stdout=stdout, stderr=stderr, preexec_fn=preexec_fn, close_fds=close_fds, shell=shell, cwd=cwd, env=env, universal_newlines=universal_newlines, startupinfo=startupinfo, creationflags=creationflags, restore_signals=restore_signals, start_new_session=start_new_session, pass_fds=pass_fds, encoding=encoding, errors=errors, text=text)
 
 
+# keeps the beginning of an output of a process, at most OUTPUT_LIMIT bytes
+# and looks for the desired string in the whole output as it is read
+class OutputBuffer :
+
+	def __init__(self, desired) :
+		self.desired = desired.encode() if desired is not None else None
+		self.found = desired is not None and len(desired) == 0
+		self.head = bytearray()
+		self.tail = b"" # end of the previous read, to find the desired string across two reads
+	
+	def feed(self, data) :
+		if len(self.head) < OUTPUT_LIMIT :
+			self.head += data[:OUTPUT_LIMIT - len(self.head)]
+		if self.desired is not None and not self.found :
+			window = self.tail + data
+			self.found = self.desired in window
+			self.tail = window[len(window) - len(self.desired) + 1:]
+	
+	def getvalue(self) :
+		return bytes(self.head)
+
+
 def printset_debug(iseqs) :
 	for sp in list(iseqs) :
 		print(sp)
@@ -103,59 +491,267 @@ def print_files_debug(dirname) :
 	print()
 
 
-# writes the sequences and their species in a fasta file
-def iseqs_to_file(iseqs, inputfilename, outputfilename) :
-	inputfile = open(inputfilename, 'r')
-	outputfile = open(outputfilename, 'w')
-	outputfile.truncate(0)
+# writes all the bytes of data in the file descriptor
+def write_all(fd, data) :
+	view = memoryview(data)
+	while len(view) != 0 :
+		view = view[os.write(fd, view):]
 
+
+# copies count bytes of the file descriptor infd, from the offset, at the actual position of outfd
+# the bytes are copied by the kernel if it can, else by chunks of COPY_SIZE bytes
+def copy_range(infd, outfd, offset, count) :
+	global COPY_METHOD
+	end = offset + count
+
+	while offset < end :
+		if COPY_METHOD == "copy_file_range" :
+			try :
+				n = os.copy_file_range(infd, outfd, end - offset, offset)
+			except OSError :
+				COPY_METHOD = "sendfile" if hasattr(os, "sendfile") else "read"
+				continue
+		
+		elif COPY_METHOD == "sendfile" :
+			try :
+				n = os.sendfile(outfd, infd, offset, end - offset)
+			except OSError :
+				COPY_METHOD = "read"
+				continue
+		
+		else :
+			data = os.pread(infd, min(COPY_SIZE, end - offset), offset)
+			write_all(outfd, data)
+			n = len(data)
+
+		# end of the input file
+		if n == 0 :
+			break
+		offset += n
+
+
+# copies count bytes of the file descriptor infd, from the offset, in the pipe outfd
+# the bytes are sent by the kernel if it can, else by chunks of COPY_SIZE bytes
+def stream_range(infd, outfd, offset, count) :
+	end = offset + count
+	sendfile = hasattr(os, "sendfile")
+
+	while offset < end :
+		if sendfile :
+			try :
+				n = os.sendfile(outfd, infd, offset, end - offset)
+			# the pipe closed by the command ends the copy
+			except BrokenPipeError :
+				raise
+			except OSError :
+				sendfile = False
+				continue
+		else :
+			data = os.pread(infd, min(COPY_SIZE, end - offset), offset)
+			write_all(outfd, data)
+			n = len(data)
+
+		# end of the input file
+		if n == 0 :
+			break
+		offset += n
+
+
+# writes the sequences and their species in fasta format in outputfd, copying them with copyrange
+# returns the number of bytes written
+def write_iseqs(iseqs, inputfd, outputfd, copyrange=copy_range) :
+	nbytes = 0
 	ordered_iseqs = sorted(list(iseqs), key=lambda x:x.begin_seq) # ordering of header's sequences by index of first nucleotide of the initial sequence
 	for (i, sp) in enumerate(ordered_iseqs) :
 			
 		for (j, subseq) in enumerate(sorted(sp.subseqs, key=lambda x:x[0])) :
-			if i != 0 or j != 0 :
-				outputfile.write("\n")
-			
 			(begin, end) = subseq
-			firstcharseq = sp.begin_seq
-			inputfile.seek(firstcharseq)
 			
-			# counts the number of line breaks in the seq before the first nucl of the subseq
-			nb_line_breaks = 0
-			ic = firstcharseq
-			while ic < begin :
-				if ic + CHUNK_SIZE < begin :
-					nb_line_breaks += inputfile.read(CHUNK_SIZE).count('\n')
-					ic += CHUNK_SIZE
-				else :
-					nb_line_breaks += inputfile.read(begin-ic).count('\n')
-					ic = begin
-			
-			#print("line breaks =", nb_line_breaks)
-			
-			# writes the header
-			firstnuclsubseq = begin - firstcharseq + 1 - nb_line_breaks
+			# writes the header, with the position of the first nucl of the subseq
+			firstnuclsubseq = sp.lineindex.nucl_position(begin) + 1
 			header = sp.header + ", position " + str(firstnuclsubseq)
-			outputfile.write(">" + header + "\n")
+			header = (">" + header + "\n").encode(errors="surrogateescape")
+			if nbytes != 0 :
+				header = b"\n" + header
+			write_all(outputfd, header)
 			
-			# read the subseq from the input and writes it in the output
-			inputfile.seek(begin)
-			ic = begin
-			while ic < end :
-				if ic + CHUNK_SIZE < end :
-					actual_subseq = inputfile.read(CHUNK_SIZE)
-					outputfile.write(actual_subseq)
-					ic += CHUNK_SIZE
-				else :
-					actual_subseq = inputfile.read(end-begin)
-					outputfile.write(actual_subseq)
-					ic = end
+			# copies the subseq from the input to the output
+			copyrange(inputfd, outputfd, begin, end - begin)
+			nbytes += len(header) + end - begin
+	
+	global BYTES_WRITTEN
+	with BYTES_LOCK :
+		BYTES_WRITTEN += nbytes
+	return nbytes
+
 
-			#actual_subseq = inputfile.read(end-begin)
-			#outputfile.write(actual_subseq)
+# writes the sequences and their species in a fasta file
+# returns the number of bytes written
+def iseqs_to_file(iseqs, inputfilename, outputfilename) :
+	inputfd = os.open(inputfilename, os.O_RDONLY)
+	try :
+		outputfd = os.open(outputfilename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+		try :
+			return write_iseqs(iseqs, inputfd, outputfd)
+		finally :
+			os.close(outputfd)
+	finally :
+		os.close(inputfd)
+
+
+# writes the sequences and their species in a pipe, from a writer thread of a test
+# output is the file descriptor of the pipe, or the name of a fifo, opened once the command opens it
+# the writing stops if the command closes the pipe before reading everything
+def stream_iseqs(iseqs, inputfilename, output) :
+	try :
+		outputfd = os.open(output, os.O_WRONLY) if isinstance(output, str) else output
+	except OSError :
+		return None
+	try :
+		inputfd = os.open(inputfilename, os.O_RDONLY)
+		try :
+			write_iseqs(iseqs, inputfd, outputfd, stream_range)
+		finally :
+			os.close(inputfd)
+	except BrokenPipeError :
+		pass
+	finally :
+		os.close(outputfd)
+
+
+# makes dst share the content of src, with a reflink or else a hardlink
+# a reflink is a copy of its own, that the command can modify in place without changing src
+# returns False if the filesystem can do none of them
+def link_file(src, dst) :
+	global LINK_METHOD
+	
+	if LINK_METHOD == "reflink" :
+		try :
+			with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst :
+				fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+			return True
+		except OSError as e :
+			Path(dst).unlink(missing_ok=True)
+			if e.errno != errno.EXDEV :
+				LINK_METHOD = "hardlink"
+	
+	try :
+		os.link(src, dst)
+		return True
+	except OSError :
+		return False
+
+
+# keeps the last versions of each input file written in a directory
+# a file with the same intervals as a kept version is linked to it instead of being written again
+# the files of several tests are written at once, the versions are only looked up and kept under the lock
+class FileCache :
+
+	def __init__(self, dirname) :
+		self.dirname = dirname
+		self.versions = dict() # input filename : OrderedDict of key : (path, size, mtime) of the kept versions
+		self.nbfiles = 0
+		self.lock = threading.Lock()
+	
+	# returns a fingerprint of the intervals of the species of one file
+	def file_key(self, iseqs) :
+		return tuple(sorted((sp.begin_seq, tuple(sorted(sp.subseqs))) for sp in iseqs))
+	
+	# writes the species of iseqs in outputfilename, or links it to a version with the same content
+	# returns the number of bytes written
+	def materialise(self, iseqs, inputfilename, outputfilename) :
+		key = self.file_key(iseqs)
+		with self.lock :
+			versions = self.versions.setdefault(inputfilename, OrderedDict())
+			if key in versions :
+				(path, size, mtime) = versions[key]
+				st = os.stat(path)
+				# the command may have modified its input through another link
+				if (st.st_size, st.st_mtime_ns) == (size, mtime) and link_file(path, outputfilename) :
+					versions.move_to_end(key)
+					return 0
+				del versions[key]
+				Path(path).unlink()
+			path = self.dirname + "/" + str(self.nbfiles)
+			self.nbfiles += 1
+		
+		nbytes = iseqs_to_file(iseqs, inputfilename, outputfilename)
+		
+		# keeps this version, removing the oldest one
+		with self.lock :
+			Path(self.dirname).mkdir(exist_ok=True)
+			if key not in versions and link_file(outputfilename, path) :
+				st = os.stat(path)
+				versions[key] = (path, st.st_size, st.st_mtime_ns)
+				if len(versions) > FILE_CACHE_VERSIONS :
+					(oldpath, size, mtime) = versions.popitem(last=False)[1]
+					Path(oldpath).unlink()
+		
+		return nbytes
 	
-	inputfile.close()
-	outputfile.close()
+	def clear(self) :
+		rmtree(self.dirname, ignore_errors=True)
+		self.versions = dict()
+
+
+FILE_CACHE = FileCache("minimise_cache")
+
+
+# directories where the commands are run, made once under a root directory and reused between the tests
+# the candidate files stay in a directory after its test, and are only written again when they change
+class WorkdirPool :
+
+	def __init__(self, root) :
+		Path(root).mkdir(parents=True, exist_ok=True)
+		self.root = mkdtemp(prefix="minimise_", dir=root)
+		self.free = list() # dirnames of the directories not used by a test
+		self.contents = dict() # dirname : dict of the name of a candidate file : (key, size, mtime, inode)
+	
+	def acquire(self) :
+		if len(self.free) != 0 :
+			return self.free.pop()
+		dirname = self.root + "/" + str(len(self.contents))
+		Path(dirname).mkdir()
+		self.contents[dirname] = dict()
+		return dirname
+	
+	# removes the files made by the command and keeps the candidate files for the next test
+	def release(self, dirname) :
+		files = self.contents[dirname]
+		for entry in os.scandir(dirname) :
+			if entry.name not in files :
+				if entry.is_dir(follow_symlinks=False) :
+					rmtree(entry.path)
+				else :
+					os.unlink(entry.path)
+		self.free.append(dirname)
+	
+	# returns True if the file was written with the content of key and has not been modified since
+	def holds(self, filename, key) :
+		(dirname, name) = os.path.split(filename)
+		files = self.contents.get(dirname)
+		if files is None or name not in files :
+			return False
+		(filekey, size, mtime, inode) = files[name]
+		if filekey != key :
+			return False
+		try :
+			st = os.stat(filename)
+		except OSError :
+			return False
+		return (st.st_size, st.st_mtime_ns, st.st_ino) == (size, mtime, inode)
+	
+	def record(self, filename, key) :
+		(dirname, name) = os.path.split(filename)
+		if dirname in self.contents :
+			st = os.stat(filename)
+			self.contents[dirname][name] = (key, st.st_size, st.st_mtime_ns, st.st_ino)
+	
+	def clear(self) :
+		rmtree(self.root, ignore_errors=True)
+
+
+WORKDIRS = None # WorkdirPool of the run, None if the files are not written in a pool
 
 
 def get_output_filename(filename, cmdargs, dirname) :
@@ -163,358 +759,1750 @@ def get_output_filename(filename, cmdargs, dirname) :
 	return dirname + "/" + name
 
 
+# writes a file of a candidate with write(), unless its directory already holds the content of this key
+def put_file(outputfilename, key, write) :
+	if WORKDIRS is not None and WORKDIRS.holds(outputfilename, key) :
+		return None
+	Path(outputfilename).unlink(missing_ok=True) # the file may be linked to the files of other directories
+	write()
+	if WORKDIRS is not None :
+		WORKDIRS.record(outputfilename, key)
+
+
+def write_text(filename, text) :
+	with open(filename, 'w') as f :
+		f.write(text)
+
+
+# writes the names of the files that still have species in the file of files
+# returns the dict of the filename of each of these files : its species
+def write_fof(spbyfile, cmdargs, dirname) :
+	iseqsbyfile = dict()
+	for iseqs in spbyfile :
+		if len(iseqs) != 0 :
+			iseqsbyfile[iseqs[0].filename] = iseqs
+	fof = "\n".join(Path(get_output_filename(f, cmdargs, dirname)).name for f in iseqsbyfile)
+	outfofname = get_output_filename(cmdargs.infilename, cmdargs, dirname)
+	put_file(outfofname, fof, lambda : write_text(outfofname, fof))
+	return iseqsbyfile
+
+
+# makes a fifo, unless there is already one
+def make_fifo(filename) :
+	try :
+		if stat.S_ISFIFO(os.stat(filename).st_mode) :
+			return None
+		os.unlink(filename)
+	except FileNotFoundError :
+		pass
+	os.mkfifo(filename)
+	if WORKDIRS is not None :
+		WORKDIRS.record(filename, "fifo")
+
+
+# prepares the directory of a test whose sequences are streamed to the command, and returns the streams to write
+# a stream is (iseqs, inputfilename, output), output being the fifo of the file, or None for the stdin of the command
+def sp_to_streams(spbyfile, cmdargs, dirname) :
+	if cmdargs.io == "stdin" :
+		iseqs = spbyfile[0] if len(spbyfile) != 0 else []
+		return [(iseqs, cmdargs.infilename, None)]
+
+	# the file of files is written, the files of sequences are fifos
+	if cmdargs.nofof :
+		iseqsbyfile = {cmdargs.infilename : spbyfile[0] if len(spbyfile) != 0 else []}
+	else :
+		iseqsbyfile = write_fof(spbyfile, cmdargs, dirname)
+	streams = list()
+	for inputfilename in cmdargs.seqfilesnames :
+		fifoname = get_output_filename(inputfilename, cmdargs, dirname)
+		make_fifo(fifoname)
+		streams.append((iseqsbyfile.get(inputfilename, []), inputfilename, fifoname))
+	return streams
+
+
 # writes the content of the fof in specified directory
 # and call the function that writes the content of the files of the fof
 def sp_to_files(spbyfile, cmdargs, dirname) :
 
 	if cmdargs.nofof : 
-		iseqs = spbyfile[0]
-		if len(iseqs) != 0 :
-			inputfilename = iseqs[0].filename
-			outputfilename = get_output_filename(inputfilename, cmdargs, dirname)
-			iseqs_to_file(spbyfile[0], inputfilename, outputfilename)
-		
-		# makes the empty file
-		else :
-			open(get_output_filename(cmdargs.infilename, cmdargs, dirname), 'w').close()
-		
+		iseqs = spbyfile[0] if len(spbyfile) != 0 else []
+		outputfilename = get_output_filename(cmdargs.infilename, cmdargs, dirname)
+		# makes an empty file if there is no specie left
+		put_file(outputfilename, FILE_CACHE.file_key(iseqs), lambda : iseqs_to_file(iseqs, cmdargs.infilename, outputfilename))
 		return None
 
-	files_to_truncate = cmdargs.get_all_infiles()
-	outfofname = get_output_filename(cmdargs.infilename, cmdargs, dirname)
+	iseqsbyfile = write_fof(spbyfile, cmdargs, dirname)
 	
-	try :
-		with open(outfofname, 'w') as fof :
-			
-			for (i, iseqs) in enumerate(spbyfile) :
-				
-				if len(iseqs) != 0 :
-					
-					inputfilename = iseqs[0].filename
-					outputfilename = get_output_filename(inputfilename, cmdargs, dirname)
-
-					# writes its name in the file of files
-					if i != 0 :
-						fof.write("\n")
-					fof.write(Path(outputfilename).name)
+	for inputfilename in cmdargs.seqfilesnames :
+		iseqs = iseqsbyfile.get(inputfilename, [])
+		outputfilename = get_output_filename(inputfilename, cmdargs, dirname)
 		
-					# call the function that writes the content of the file
-					iseqs_to_file(iseqs, inputfilename, outputfilename)
-
-					files_to_truncate.remove(iseqs[0].filename)
-				
-			for f in files_to_truncate :
-				open(get_output_filename(f, cmdargs, dirname), 'w').close()
-					
-	except IOError :
-		raise
+		# writes the content of the file, or links it to an identical version
+		if len(iseqs) != 0 :
+			write = lambda : FILE_CACHE.materialise(iseqs, inputfilename, outputfilename)
+		# makes the empty file
+		else :
+			write = lambda : open(outputfilename, 'w').close()
+		put_file(outputfilename, FILE_CACHE.file_key(iseqs), write)
 
 
+# stdout and stderr are the OutputBuffer of the process
 def compare_output(acutal_output, desired_output) :
 	rcode, stdout, stderr = acutal_output
 	rcode2, stdout2, stderr2 = desired_output
 
+	# only the timeout can give the desired output when nothing else is desired
+	if desired_output == (None, None, None) :
+		return False
+
 	checkreturn = rcode2 is None or rcode2 == rcode
-	checkstdout = stdout2 is None or stdout2 in stdout.decode()
-	checkstderr = stderr2 is None or stderr2 in stderr.decode()
+	checkstdout = stdout2 is None or stdout.found
+	checkstderr = stderr2 is None or stderr.found
 	r = checkreturn and checkstdout and checkstderr
 	return r
 
 
-# launches the processes in the console, from a command and a list of directories
-# returns the dictionnary of process(Popen) : dirname(String)
-def trigger_processes(cmdline, dirnamelist, priorities):
-	dirnamedict = dict()
-
-	for i in range(len(dirnamelist)):
-		dirname = dirnamelist[i]
-		#print("Process running in:", dirname)
-		p = PopenExtended(cmdline, shell=True, cwd=dirname, stdout=PIPE, stderr=PIPE, prioritised=priorities[i])
-		dirnamedict[p] = dirname
-		#sleep(0.1) # launches processes at different times
+# registers the pipes of the process, and its end if it can be awaited, in the selector
+def watch_process(p, selector, desired_output) :
+	p.buffers = (OutputBuffer(desired_output[1]), OutputBuffer(desired_output[2]))
+	for (pipe, buffer) in zip((p.stdout, p.stderr), p.buffers) :
+		os.set_blocking(pipe.fileno(), False)
+		selector.register(pipe, selectors.EVENT_READ, (p, buffer))
+	p.openpipes = 2
+	
+	if hasattr(os, "pidfd_open") :
+		try :
+			p.pidfd = os.pidfd_open(p.pid)
+			selector.register(p.pidfd, selectors.EVENT_READ, (p, None))
+		except OSError :
+			p.pidfd = None
+	else :
+		p.pidfd = None
 
-	return dirnamedict
 
+# kills the process and all the processes it started, in its own session
+# the test of a remote worker is cancelled by a message
+def kill_process_group(p) :
+	if isinstance(p, RemoteCall) :
+		p.worker.cancel(p)
+		return None
+	try :
+		os.killpg(p.pid, signal.SIGKILL)
+	except ProcessLookupError :
+		pass
+
+
+# returns True if the outputs read so far are enough to get the desired output
+# it can only be known before the end of the process when no returncode is desired
+def output_decided(p, desired_output) :
+	(rcode2, stdout2, stderr2) = desired_output
+	(stdoutbuffer, stderrbuffer) = p.buffers
+	if desired_output == (None, None, None) :
+		return False
+	return rcode2 is None and (stdout2 is None or stdoutbuffer.found) and (stderr2 is None or stderrbuffer.found)
+
+
+# handles an event of the selector: reads a pipe or reaps an ended process
+# a process is killed as soon as its outputs contain the desired ones
+def handle_event(key, selector, desired_output) :
+	(p, buffer) = key.data
+
+	if buffer is None :
+		selector.unregister(key.fileobj)
+		os.close(key.fileobj)
+		p.pidfd = None
+		p.poll()
+		return None
 
-def wait_processes(desired_output, dirnamedict):
-	processes = list(dirnamedict.keys())
-	#print("processes : ", processes)
-	firstproc = None
-	tmpproc = None
+	data = os.read(key.fd, READ_SIZE)
+	if len(data) != 0 :
+		buffer.feed(data)
+		if not p.decided and p.returncode is None and output_decided(p, desired_output) :
+			p.decided = True
+			kill_process_group(p)
+	else :
+		selector.unregister(key.fileobj)
+		p.openpipes -= 1
 
-	# wait until the last process terminates
-	while len(processes) > 0 : #and firstproc is None :
 
-		# check for terminated process
-		for p in processes:
-			if p.poll() is not None: # one of the processes finished
-				
-				#print(f"Process terminated on code {p.returncode}")
-				#for line in p.stdout:
-				#	print(line)
-				
-				# if desired output
-				if compare_output((p.returncode, p.stdout, p.stderr), desired_output) :
+# returns True if the process ended and its outputs were read until their end
+# the outputs of an interrupted process are not awaited, its children may still hold the pipes
+def process_ended(p) :
+	if p.pidfd is None and p.returncode is None :
+		p.poll()
+	return p.returncode is not None and (p.openpipes == 0 or p.killed or p.decided or p.timedout)
 
-					if not p.prioritised :
-						tmpproc = p
-					
-					else :
-						firstproc = p
-						for ptokill in processes :
-							ptokill.kill()
-
-				# finalize the termination of the process
-				processes.remove(p)
-				p.communicate()
-				break
 
-		sleep(.001)
+# kills the processes that run since more than timeout seconds
+# a process that ended while its children still hold its pipes is not finished either, its session is killed the same way
+# returns the number of seconds before the next process to interrupt, None if there is none
+def interrupt_late_processes(processes, timeout) :
+	if timeout is None :
+		return None
+	now = monotonic()
+	nextdeadline = None
+	for p in processes :
+		if process_ended(p) or p.killed or p.decided or p.timedout :
+			continue
+		if now - p.start >= timeout :
+			p.timedout = True
+			kill_process_group(p)
+		elif nextdeadline is None or p.start + timeout < nextdeadline :
+			nextdeadline = p.start + timeout
+	return nextdeadline - now if nextdeadline is not None else None
+
+
+# sets the outcome and the verdict of an ended process
+def process_outcome(p, cmdargs) :
+	(stdoutbuffer, stderrbuffer) = p.buffers
+	# a process interrupted by the timeout has no returncode
+	if p.timedout :
+		p.outcome = (None, stdoutbuffer.getvalue(), stderrbuffer.getvalue())
+		p.verdict = cmdargs.timeout_desired
+	else :
+		p.outcome = (p.returncode, stdoutbuffer.getvalue(), stderrbuffer.getvalue())
+		p.verdict = p.decided or compare_output((p.returncode, stdoutbuffer, stderrbuffer), cmdargs.desired_output)
+
+
+# returns the function of an oracle given as "module:function" or "path.py:function"
+def load_oracle(oracle) :
+	(modulename, functionname) = oracle.rsplit(":", 1)
+	if modulename.endswith(".py") :
+		path = Path(modulename).resolve()
+		sys.path.insert(0, str(path.parent)) # the oracle may import the modules next to it
+		spec = importlib.util.spec_from_file_location(path.stem, path)
+		module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+	else :
+		module = importlib.import_module(modulename)
+	return getattr(module, functionname)
+
+
+# main function of an OracleWorker: calls the oracle on the input file of each directory received
+# sends back the result, and what the oracle printed on stdout and stderr
+def oracle_worker_main(connection, oracle) :
+	os.setsid() # the worker and its children are killed together, like the processes of the commands
+	function = load_oracle(oracle)
+	while True :
+		try :
+			(dirname, filename) = connection.recv()
+		except EOFError :
+			break
+		os.chdir(dirname)
+		stdout = io.StringIO()
+		stderr = io.StringIO()
+		with redirect_stdout(stdout), redirect_stderr(stderr) :
+			try :
+				result = function(filename)
+			except SystemExit as e :
+				result = e.code if isinstance(e.code, int) else 1
+			# an exception is an error of the command
+			except BaseException :
+				traceback.print_exc()
+				result = 1
+		connection.send((result, stdout.getvalue().encode(errors="surrogateescape"), stderr.getvalue().encode(errors="surrogateescape")))
+
+
+# warm python process calling the oracle, that keeps the oracle imported from one test to the next
+# the workers are started by a fork server, as they are replaced by the thread of the Scheduler while the reductions run
+# and forking a process with several threads may deadlock the child
+class OracleWorker :
+
+	def __init__(self, oracle) :
+		(self.connection, child) = Pipe()
+		self.process = ORACLE_CONTEXT.Process(target=oracle_worker_main, args=(child, oracle), daemon=True)
+		self.process.start()
+		child.close()
 	
-	return firstproc if firstproc is not None else tmpproc
-
+	def close(self) :
+		self.connection.close()
+		self.process.kill()
+		self.process.join()
+
+
+# call of the oracle by an OracleWorker, followed by the Scheduler like the process of a command
+# the result of the oracle is its verdict if it is a bool, else its returncode
+class OracleCall :
+
+	def __init__(self, worker) :
+		self.worker = worker
+		self.pid = worker.process.pid # kill_process_group kills the worker
+		self.pidfd = worker.connection.fileno() # the end of the call is awaited on the connection
+		self.returncode = None
+		self.result = None
+		self.killed = False
+		self.decided = False
+		self.timedout = False
+		self.start = None
+		self.outcome = None
+		self.verdict = None
+		self.buffers = None
+		self.openpipes = 0
+
+
+# reads the result of the call of the oracle, or notices its worker was killed
+def handle_oracle_event(key, selector, desired_output) :
+	(p, kind) = key.data
+	selector.unregister(key.fileobj)
+	p.buffers = (OutputBuffer(desired_output[1]), OutputBuffer(desired_output[2]))
+	try :
+		(p.result, stdout, stderr) = p.worker.connection.recv()
+	except (EOFError, OSError) :
+		p.returncode = -signal.SIGKILL
+		return None
+	p.buffers[0].feed(stdout)
+	p.buffers[1].feed(stderr)
+	p.returncode = 0 if p.result is None or isinstance(p.result, bool) else int(p.result)
 
-# returns the index of the dirname that caused the first desired output when running commands
-# returns -1 if none of them returned the desired output
-def trigger_and_wait_processes(cmdargs, dirnamelist, priorities=None) :
-	#print(dirnamelist)
-	if priorities is None :
-		priorities = [True for x in dirnamelist]
-	dirnamedict = trigger_processes(cmdargs.subcmdline_replaced, dirnamelist, priorities) # creates dirnamedict of process:dirname
-	#print("proc dict : ", dirnamedict)
-	firstproc = wait_processes(cmdargs.desired_output, dirnamedict.copy())
-	#print("first process : ", firstproc)
 
-	if firstproc is None :
+# sets the outcome and the verdict of an ended call of the oracle
+def oracle_outcome(p, cmdargs) :
+	if not isinstance(p.result, bool) :
+		process_outcome(p, cmdargs)
 		return None
-	else :
-		return dirnamedict.get(firstproc)
+	(stdoutbuffer, stderrbuffer) = p.buffers
+	p.outcome = (None, stdoutbuffer.getvalue(), stderrbuffer.getvalue())
+	p.verdict = p.result
+
+
+# returns the hash identifying the species parsed and the desired output
+# a worker only runs the tests of a coordinator that has the same one, its input files may be elsewhere
+def run_fingerprint(spbyfile, cmdargs) :
+	layout = [[[sp.header, sp.begin_seq, sp.subseqs] for sp in iseqs] for iseqs in spbyfile]
+	return hashlib.sha256(json.dumps([layout, list(cmdargs.desired_output)]).encode()).hexdigest()
+
+
+# returns the (host, port) of an address given as "host:port"
+def parse_address(address) :
+	(host, port) = address.rsplit(":", 1)
+	return (host, int(port))
+
+
+# returns the configuration of spbyfile as sent to the workers: the index of the file, the beginning and the subseqs of each specie
+def config_to_json(spbyfile, cmdargs) :
+	return [[[cmdargs.seqfilesnames.index(sp.filename), sp.begin_seq, sp.subseqs] for sp in iseqs] for iseqs in spbyfile]
+
+
+# worker of another node connected to the coordinator, that runs the tests sent on its own copy of the inputs
+# the messages are lines of json, the tests being sent as the intervals of the species and not as files
+class RemoteWorker :
+
+	def __init__(self, connection, address) :
+		self.connection = connection
+		self.address = address
+		self.slots = 0 # number of tests run at once by the worker, known once it said hello
+		self.calls = dict() # id : RemoteCall not answered yet, even if the Scheduler does not wait for it any more
+		self.nextid = 0
+		self.received = b"" # beginning of a line not received entirely
+
+	def send(self, message) :
+		self.connection.sendall((json.dumps(message) + "\n").encode())
+
+	# returns the messages received entirely, raises EOFError when the worker is disconnected
+	def receive(self) :
+		try :
+			data = self.connection.recv(READ_SIZE)
+		except OSError :
+			data = b""
+		if len(data) == 0 :
+			raise EOFError
+		lines = (self.received + data).split(b"\n")
+		self.received = lines.pop()
+		return [json.loads(line) for line in lines]
+
+	# sends the configuration of spbyfile to test, returns its RemoteCall
+	def call(self, spbyfile, cmdargs) :
+		p = RemoteCall(self, self.nextid)
+		self.nextid += 1
+		self.calls[p.id] = p
+		self.send({"test" : p.id, "config" : config_to_json(spbyfile, cmdargs)})
+		return p
+
+	# the test ends at once for the Scheduler, the worker answers once its command is killed
+	def cancel(self, p) :
+		p.returncode = -signal.SIGKILL
+		try :
+			self.send({"cancel" : p.id})
+		except OSError :
+			pass
+
+	def close(self) :
+		self.connection.close()
+
+
+# test run by a RemoteWorker, followed by the Scheduler like the process of a command
+class RemoteCall :
+
+	def __init__(self, worker, id) :
+		self.worker = worker
+		self.id = id
+		self.pid = None
+		self.pidfd = worker.connection.fileno() # the end of the call is awaited on the connection
+		self.returncode = None
+		self.lost = False # True if the worker was disconnected before its verdict, the test is run again
+		self.killed = False
+		self.decided = False
+		self.timedout = False
+		self.start = None
+		self.outcome = None
+		self.verdict = None
+		self.buffers = (OutputBuffer(None), OutputBuffer(None))
+		self.openpipes = 0
+
+
+# reads the messages of a RemoteWorker: its hello, or the verdicts of its tests
+# returns False if the worker is disconnected, its tests being lost
+def handle_remote_event(worker, cmdargs) :
+	try :
+		messages = worker.receive()
+	except (EOFError, ValueError) :
+		messages = None
+
+	for message in messages or [] :
+		if "hello" in message :
+			if message["hello"] != cmdargs.fingerprint :
+				worker.send({"error" : "The worker does not have the same input or desired output as the coordinator."})
+				return False
+			worker.slots = message["slots"]
+			if cmdargs.verbose :
+				print("Worker " + str(worker.address) + " connected with " + str(worker.slots) + " slots")
+		elif "done" in message :
+			p = worker.calls.pop(message["done"], None)
+			if p is None or p.returncode is not None :
+				continue
+			if message["verdict"] is None :
+				p.lost = True
+				p.returncode = -signal.SIGKILL
+				continue
+			(returncode, stdout, stderr) = message["outcome"]
+			p.outcome = (returncode, base64.b64decode(stdout), base64.b64decode(stderr))
+			p.verdict = message["verdict"]
+			p.returncode = returncode if returncode is not None else -signal.SIGKILL
+
+	if messages is None :
+		for p in worker.calls.values() :
+			if p.returncode is None :
+				p.lost = True
+				p.returncode = -signal.SIGKILL
+		worker.calls.clear()
+		return False
+	return True
+
+
+# runs the tests sent by the coordinator on the local Scheduler, until the coordinator closes the connection
+# each verdict is sent back by a thread of its own, as soon as its test is done
+def run_worker(address, spbyfile, cmdargs) :
+	species = dict()
+	for iseqs in spbyfile :
+		for sp in iseqs :
+			species[(cmdargs.seqfilesnames.index(sp.filename), sp.begin_seq)] = sp
+	connection = socket.create_connection(parse_address(address))
+	lock = threading.Lock()
+	jobs = dict() # id : Job of a test of the coordinator
+
+	def send(message) :
+		with lock :
+			connection.sendall((json.dumps(message) + "\n").encode())
+
+	# the worker may be stopping, its scheduler closed and its connection lost, the test is then not answered
+	def answer(id, job) :
+		try :
+			SCHEDULER.wait_end(job)
+		except RuntimeError :
+			return None
+		jobs.pop(id, None)
+		try :
+			if job.state != "done" :
+				send({"done" : id, "verdict" : None})
+				return None
+			# a configuration already tested is answered by the cache, with its returncode only
+			(returncode, stdout, stderr) = job.outcome
+			send({"done" : id, "verdict" : job.verdict, "outcome" : [returncode, base64.b64encode(stdout).decode(), base64.b64encode(stderr).decode()]})
+		except OSError :
+			pass
+
+	send({"hello" : cmdargs.fingerprint, "slots" : SCHEDULER.localslots})
+	try :
+		for line in connection.makefile("rb") :
+			message = json.loads(line)
+			if "error" in message :
+				raise ValueError(message["error"])
+			if "test" in message :
+				snapshot = [[species[(i, begin_seq)].with_subseqs([tuple(seq) for seq in subseqs]) for (i, begin_seq, subseqs) in filestate] for filestate in message["config"]]
+				job = SCHEDULER.submit(snapshot)
+				jobs[message["test"]] = job
+				threading.Thread(target=answer, args=(message["test"], job), daemon=True).start()
+			elif "cancel" in message :
+				job = jobs.get(message["cancel"])
+				if job is not None :
+					SCHEDULER.discard([job])
+	finally :
+		connection.close()
+
+
+# returns a canonical fingerprint of the configuration of spbyfile
+# it does not depend on the order of the files, of the species or of the subsequences
+def config_key(spbyfile) :
+	key = list()
+	for iseqs in spbyfile :
+		for sp in iseqs :
+			key.append((sp.filename, sp.begin_seq, tuple(sorted(sp.subseqs))))
+	return tuple(sorted(key))
+
+
+# returns a copy of spbyfile where the species of the dict changes have other subseqs
+# a specie whose subseqs are None in changes is removed
+def candidate(spbyfile, changes=None) :
+	if changes is None :
+		changes = dict()
+	snapshot = list()
+	with STATE_LOCK :
+		for iseqs in spbyfile :
+			copy_iseqs = list()
+			for sp in iseqs :
+				subseqs = changes.get(sp, sp.subseqs)
+				if subseqs is not None :
+					copy_iseqs.append(sp.with_subseqs(subseqs))
+			snapshot.append(copy_iseqs)
+	return snapshot
+
+
+# spans of the reduction stages and of the phases of the tests, exported as a Chrome trace
+# the reductions run in several threads, each one having its own stack of stages
+class Tracer :
+
+	def __init__(self) :
+		self.origin = monotonic()
+		self.events = list() # events of the Chrome trace format
+		self.phases = dict() # name of a phase : [number of tests, total seconds]
+		self.stages = dict() # stage : [number of tests, seconds of the command]
+		self.threads = dict() # thread ident : small number shown in the trace
+		self.lock = threading.Lock()
+		self.local = threading.local()
+	
+	def stack(self) :
+		if not hasattr(self.local, "stack") :
+			self.local.stack = list()
+		return self.local.stack
 	
+	def span(self, name, category, start, end, pid, tid, args=None) :
+		event = {"name" : name, "cat" : category, "ph" : "X", "pid" : pid, "tid" : tid, "ts" : round((start - self.origin) * 1e6, 1), "dur" : round((end - start) * 1e6, 1)}
+		if args is not None :
+			event["args"] = args
+		self.events.append(event)
+	
+	def add_stage(self, name, start, end) :
+		with self.lock :
+			tid = self.threads.setdefault(threading.get_ident(), len(self.threads))
+			self.span(name, "stage", start, end, 0, tid)
+	
+	# adds the spans of the phases of an ended test, on the lane of its slot
+	def add_job(self, job) :
+		with self.lock :
+			(name, start, end) = job.phases[0]
+			args = {"stage" : job.stage, "state" : job.state, "verdict" : job.verdict, "speculative" : job.speculative, "queued (ms)" : round((end - start) * 1000, 3)}
+			self.span("test", "test", end, job.end, 1, job.lane, args)
+			for (name, start, end) in job.phases :
+				# the time waited for a slot is not on the lane of the slot
+				if name != "queued" :
+					self.span(name, "phase", start, end, 1, job.lane)
+				total = self.phases.setdefault(name, [0, 0])
+				total[0] += 1
+				total[1] += end - start
+			total = self.stages.setdefault(job.stage, [0, 0])
+			total[0] += 1
+			total[1] += sum(end - start for (name, start, end) in job.phases if name == "command")
+	
+	def write(self, filename) :
+		names = [{"name" : "process_name", "ph" : "M", "pid" : 0, "args" : {"name" : "reduction"}}, {"name" : "process_name", "ph" : "M", "pid" : 1, "args" : {"name" : "tests"}}]
+		with open(filename, "w") as f :
+			json.dump({"traceEvents" : names + self.events, "displayTimeUnit" : "ms"}, f)
+	
+	# prints the time of each phase of the tests, and of the command in each stage of the reduction
+	def print_summary(self) :
+		print("\nphase\ttests\ttotal (s)\tmean (ms)")
+		for (name, (count, total)) in self.phases.items() :
+			print(name, count, round(total, 3), round(total / count * 1000, 3), sep="\t")
+		command = self.phases.get("command", [0, 0])[1]
+		overhead = sum(total for (name, (count, total)) in self.phases.items() if name not in ("queued", "command"))
+		print("Overhead of the tests : " + str(round(overhead, 3)) + " s, command : " + str(round(command, 3)) + " s")
+		print("\nstage\ttests\tcommand (s)")
+		for (stage, (count, total)) in sorted(self.stages.items()) :
+			print(stage, count, round(total, 3), sep="\t")
+
+
+TRACER = None # Tracer of the run, None if the run is not traced
+
+
+# decorator of a reduction stage, that the tests it submits are attributed to
+def traced_stage(function) :
+	@wraps(function)
+	def stage(*args, **kwargs) :
+		if TRACER is None :
+			return function(*args, **kwargs)
+		stack = TRACER.stack()
+		stack.append(function.__name__)
+		start = monotonic()
+		try :
+			return function(*args, **kwargs)
+		finally :
+			stack.pop()
+			TRACER.add_stage(function.__name__, start, monotonic())
+	return stage
+
+
+# returns the innermost stage of the reduction running in this thread
+def current_stage() :
+	if TRACER is None :
+		return None
+	stack = TRACER.stack()
+	return stack[-1] if len(stack) != 0 else "main"
+
+
+# declarative oracle of --simulate, whose verdict is computed from the subseqs of the configuration without running anything
+# the model is a json file {"genome" : files, "output" : expression}, the genome being optional
+# an expression is {"all" : [expressions]}, {"any" : [expressions]} or an interval of a sequence {"header" : h, "begin" : b, "end" : e}
+# with the positions of its first and after its last nucleotide, and "file" : the index of its file if several have this header
+# the interval gives the output when a subseq of the sequence contains it entirely
+# the genome is a list of files {"name" : name, "records" : [{"header" : h, "length" : n}]} simulated instead of the input
+class SimulatedOracle :
+
+	def __init__(self, filename) :
+		with open(filename) as f :
+			model = json.load(f)
+		self.genome = model.get("genome")
+		self.output = model["output"]
+		self.expression = None # output with the intervals as (filename, begin_seq, first offset, last offset + 1)
+		self.tests = 0 # number of configurations evaluated
+		self.speculative = 0 # number of them evaluated in advance for the speculative tests
+	
+	# returns the names of the files of the genome, that replace the ones of the input
+	def virtual_files(self) :
+		return [virtualfile["name"] for virtualfile in self.genome]
+	
+	# returns the species of the files of the genome, whose sequences are never read
+	# their offsets are their positions, each sequence being after the previous ones
+	def virtual_species(self) :
+		spbyfile = list()
+		for virtualfile in self.genome :
+			iseqs = list()
+			begin = 0
+			for record in virtualfile["records"] :
+				iseqs.append(SpecieData(record["header"], begin, begin + record["length"], virtualfile["name"]))
+				begin += record["length"] + 1
+			iseqs.sort(key=lambda x:x.subseqs[0][1] - x.subseqs[0][0], reverse=True)
+			spbyfile.append(iseqs)
+		return spbyfile
+	
+	# converts the positions of the intervals of the output in offsets of the species parsed
+	def resolve(self, spbyfile, cmdargs) :
+		def compile_expression(expression) :
+			if "all" in expression or "any" in expression :
+				operator = "all" if "all" in expression else "any"
+				return (operator, [compile_expression(x) for x in expression[operator]])
+			files = [cmdargs.seqfilesnames[expression["file"]]] if "file" in expression else cmdargs.seqfilesnames
+			for iseqs in spbyfile :
+				for sp in iseqs :
+					if sp.header == expression["header"] and sp.filename in files :
+						(begin, end) = (expression["begin"], expression["end"])
+						return ("interval", (sp.filename, sp.begin_seq, sp.lineindex.file_offset(begin), sp.lineindex.file_offset(end - 1) + 1))
+			raise ModelError("The sequence " + expression["header"] + " of the model is not in the input.")
+		self.expression = compile_expression(self.output)
+	
+	# returns the job submitted first among the ones not answered, its verdict and its outcome
+	# the jobs submitted between the same answers, by several reductions at once, are taken in the order of their configurations
+	def next_answer(self, scheduler) :
+		job = min(list(scheduler.pending) + list(scheduler.speculative), key=lambda job : (job.step, job.key))
+		return (job, self.verdict(job.snapshot), (None, b"", b""))
+	
+	def summary(self) :
+		return "Simulated tests : " + str(self.tests) + ", speculative : " + str(self.speculative)
+	
+	# returns True if the configuration of spbyfile keeps the intervals of the output
+	def verdict(self, spbyfile) :
+		subseqs = dict()
+		for iseqs in spbyfile :
+			for sp in iseqs :
+				subseqs[(sp.filename, sp.begin_seq)] = sp.subseqs
+		
+		def evaluate(expression) :
+			(kind, value) = expression
+			if kind == "all" :
+				return all(evaluate(x) for x in value)
+			if kind == "any" :
+				return any(evaluate(x) for x in value)
+			(filename, begin_seq, first, last) = value
+			return any(begin <= first and last <= end for (begin, end) in subseqs.get((filename, begin_seq), []))
+		return evaluate(self.expression)
+
+
+# error of the model of --simulate or of the log of --replay, that does not fit the run
+class ModelError(ValueError) :
+	pass
+
+
+# oracle of --replay, that answers the configurations with the verdicts of the tests of a RunLog, in the order the tests ended
+# the tests of the log a reduction did not need yet are cached with their verdict, as they were when they ended
+# a configuration that is not in the log is only settled once no other one can be answered: the replay then stops,
+# unless partial where it does not give the desired output without being cached as it was never run
+class ReplayedOracle :
+
+	def __init__(self, filename, partial=False) :
+		self.filename = filename
+		self.partial = partial
+		self.genome = None
+		self.entries = list() # (key, verdict, returncode, duration, speculative) of the tests done in the log, in the order they ended
+		self.position = 0 # index of the next entry to answer
+		self.description = None
+		self.tests = 0
+		self.speculative = 0
+		self.missing = 0 # number of configurations not in the log
+		self.seconds = 0 # duration of the tests replayed when they were run
+		with open(filename) as f :
+			for line in f :
+				entry = json.loads(line)
+				if "run" in entry :
+					self.description = entry["run"]
+				elif entry["state"] == "done" :
+					self.entries.append((list_to_key(entry["config"]), entry["verdict"], entry["returncode"], entry["duration"], entry["speculative"]))
+	
+	# checks that the log was made on the same input, and takes its desired output and the options of its reduction
+	def resolve(self, spbyfile, cmdargs) :
+		if self.description is None or "jobs" not in self.description :
+			raise ModelError("The log " + self.filename + " does not describe its run.")
+		cmdargs.desired_output = tuple(self.description["desired_output"])
+		cmdargs.jobs = self.description["jobs"]
+		cmdargs.nbchunks = self.description["chunks"]
+		cmdargs.group_removal = self.description["group_removal"]
+		if run_fingerprint(spbyfile, cmdargs) != self.description["fingerprint"] :
+			raise ModelError("The log " + self.filename + " was made with another input.")
+	
+	# returns the job whose test ended first in the log among the ones not answered, its verdict and its outcome
+	# the outcome of a configuration missing from the log is None
+	def next_answer(self, scheduler) :
+		while self.position < len(self.entries) :
+			(key, verdict, returncode, duration, speculative) = self.entries[self.position]
+			self.position += 1
+			self.seconds += duration
+			job = scheduler.jobs.get(key)
+			if job is not None :
+				return (job, verdict, (returncode, b"", b""))
+			self.tests += 1
+			if speculative :
+				self.speculative += 1
+			if key not in OUTCOME_CACHE :
+				OUTCOME_CACHE.add(key, (returncode, b"", b""), verdict)
+		
+		if not self.partial :
+			raise ModelError("A configuration needed is not in the log " + self.filename + ", add --replay-partial to replay it anyway.")
+		self.missing += 1
+		return (scheduler.pending[0], False, None)
+	
+	def summary(self) :
+		s = "Replayed tests : " + str(self.tests) + ", speculative : " + str(self.speculative) + ", not in the log : " + str(self.missing) + "\n"
+		s += "Duration of the replayed tests when they were run : " + str(round(self.seconds, 3)) + " seconds"
+		return s
 
-def make_new_dir() :
-	i = 0
-	dirname = str(i)
-	while Path(dirname).exists() :
-		i += 1
-		dirname = str(i)
-	Path(dirname).mkdir()
-	return dirname
 
+CRITICAL_PATH = threading.local() # number of tests run one after the other before the current point of the reduction of the thread
 
-def prepare_dir(spbyfile, cmdargs) :
-	global NB_PROCESS
-	NB_PROCESS += 1
-	dirname = make_new_dir()
-	sp_to_files(spbyfile, cmdargs, dirname)
-	#print_files_debug(dirname)
-	return dirname
 
+def path_depth() :
+	return getattr(CRITICAL_PATH, "depth", 0)
 
-# reduces the sequence, cutting first and last nucleotides
-# cutting in half successively with an iterative binary search
-# returns the new reduced sequence, WITHOUT ADDING IT TO THE SPECIE'S LIST OF SEQS
-def strip_sequence(seq, sp, spbyfile, flag_begining, cmdargs) :
-	(begin, end) = seq
-	seq1 = (begin, end)
 
-	imin = begin
-	imax = end
-	imid = (imin+imax) // 2
+# the reduction of the thread has waited for tests ending at the depth
+def reach_depth(depth) :
+	CRITICAL_PATH.depth = max(path_depth(), depth)
+
+
+# runs the function of a reduction in another thread, that starts at the depth of the thread launching it
+# the tests the reduction speculated are forgotten at its end, the thread being reused by other reductions
+# group is the ReductionGroup of the reduction, that counts it until its end
+# returns the result of the function and the depth it reached
+def run_at_depth(function, depth, group) :
+	CRITICAL_PATH.depth = depth
+	try :
+		result = function()
+	finally :
+		SCHEDULER.end_speculation()
+		SCHEDULER.leave(group)
+	return (result, path_depth())
+
+
+# test of a configuration, run by the Scheduler
+class Job :
+
+	def __init__(self, key, snapshot, speculative, stage=None) :
+		self.key = key
+		self.snapshot = snapshot # copy of spbyfile with the configuration to test
+		self.speculative = speculative # True while no reduction waits for its verdict
+		self.refs = 0 # number of reductions waiting for its verdict
+		self.state = "pending" # pending, writing, running, done or cancelled
+		self.verdict = None # True if the outcome is the desired output
+		self.outcome = None # (returncode, stdout, stderr)
+		self.process = None
+		self.dirname = None
+		self.writers = list() # (thread, output) writing the streams of the test
+		self.start = None
+		self.end = None
+		self.stage = stage # stage of the reduction that submitted the test, when the run is traced
+		self.lane = None # number of the slot of the test in the trace
+		self.phases = [("queued", monotonic(), None)] # (name, start, end) of the phases of the test
+		self.depth = path_depth() + 1 # number of tests run one after the other until the end of this one
+		self.step = 0 # number of tests answered by the model before its submission
+
+
+# reductions started by a thread in others, nbthreads of them running at once, the next ones waiting for a thread
+# running counts the threads that run one until no reduction is left to start, then the reductions left
+class ReductionGroup :
+
+	def __init__(self, nbreductions, nbthreads) :
+		self.running = min(nbreductions, nbthreads)
+		self.queued = nbreductions - self.running
+		self.parked = False # True while the thread that started them waits for their end
+
+
+# runs the tests of all the reductions on nbslots slots, from a thread of its own
+# the slots left free run speculative tests, that the reductions may need next
+# with listen, the workers of other nodes that connect to the address add their slots
+# with a model, nothing is run: the model answers a test once every reduction waits, so the tests depend on the verdicts only
+class Scheduler :
+
+	def __init__(self, cmdargs, nbslots, listen=None) :
+		self.cmdargs = cmdargs
+		self.localslots = nbslots
+		self.remotes = list() # RemoteWorkers connected
+		self.jobs = dict() # key : pending or running Job
+		self.pending = deque() # Jobs waited by a reduction, in submission order
+		self.speculative = deque() # speculative Jobs, in submission order
+		self.running = list()
+		self.writing = list() # Jobs whose files are written on a local slot, before their command is launched
+		self.written = deque() # (job, streams, exception raised) of the Jobs whose files are written
+		self.freelanes = set() # lanes of the trace not used by a running test
+		self.speculations = dict() # thread of a reduction : keys of the configurations of its last speculation
+		self.condition = threading.Condition()
+		self.error = None # exception raised in the thread of the scheduler
+		self.closed = False
+		self.active = 1 # number of threads running a reduction without waiting for a test, starting with the one making the scheduler
+		self.blocked = set() # threads waiting for the next answer of the model
+		self.answered = 0 # number of tests answered by the model
+		# the oracle is called by warm workers, started before the thread
+		self.workers = [OracleWorker(cmdargs.oracle) for i in range(nbslots)] if cmdargs.oracle is not None else None
+		# the files of the tests are written out of the lock, by a thread for each local slot
+		self.writepool = ThreadPoolExecutor(nbslots)
 		
-	while imid != imin and imid != imax :
-
-		# get the most central quarter
-		seq1 = (imid, end) if flag_begining else (begin, imid)
-		sp.subseqs.append(seq1)
-		dirname = prepare_dir(spbyfile, cmdargs)
-		firstdirname = trigger_and_wait_processes(cmdargs, [dirname])
-		rmtree(dirname)
-		sp.subseqs.remove(seq1)
-
-		# if the cut maintain the output, we keep cutting toward the center of the sequence
-		if firstdirname is not None and firstdirname == dirname :
-			if flag_begining :
-				imin = imid
+		# the thread waits for the processes and for a byte written in the wakeup pipe
+		self.selector = selectors.DefaultSelector()
+		(self.wakeupread, self.wakeupwrite) = os.pipe()
+		os.set_blocking(self.wakeupread, False)
+		self.selector.register(self.wakeupread, selectors.EVENT_READ, "wakeup")
+		self.listener = None
+		if listen is not None :
+			self.listener = socket.create_server(parse_address(listen))
+			self.selector.register(self.listener, selectors.EVENT_READ, "listen")
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+	
+	def wake(self) :
+		os.write(self.wakeupwrite, b"\0")
+	
+	# number of tests run at once, on this node and on the workers connected
+	@property
+	def nbslots(self) :
+		return self.localslots + sum(worker.slots for worker in self.remotes)
+	
+	# returns the Job testing the configuration of spbyfile modified by changes
+	# the configurations already tested are answered by the cache, and identical ones share their Job
+	# stage is the stage of the reduction shown in the trace, the current one by default
+	def submit(self, spbyfile, changes=None, speculative=False, force=False, stage=None) :
+		snapshot = candidate(spbyfile, changes)
+		key = config_key(snapshot)
+
+		with self.condition :
+			job = self.jobs.get(key)
+			
+			if job is None :
+				job = Job(key, snapshot, speculative, stage if stage is not None else current_stage())
+				job.step = self.answered
+				verdict = None if force else OUTCOME_CACHE.get_verdict(key)
+				if verdict is not None :
+					job.state = "done"
+					job.verdict = verdict
+					job.outcome = (OUTCOME_CACHE.returncodes.get(key), b"", b"")
+					job.depth = path_depth()
+					return job
+				self.jobs[key] = job
+				(self.speculative if speculative else self.pending).append(job)
+				self.wake()
+			
+			# a reduction now waits for a speculative test
+			elif job.speculative and not speculative :
+				job.speculative = False
+				if job.state == "pending" :
+					self.speculative.remove(job)
+					self.pending.append(job)
+					self.wake()
+			
+			if not speculative :
+				job.refs += 1
+			return job
+	
+	# gives the verdict of the model or of the log to the pending job, without running it
+	# an outcome None is a configuration missing from the log, that is neither counted nor cached
+	def answer(self, job, verdict, outcome) :
+		global NB_PROCESS
+		(self.speculative if job.speculative else self.pending).remove(job)
+		del self.jobs[job.key]
+		job.verdict = verdict
+		job.outcome = outcome
+		job.state = "done"
+		job.start = job.end = monotonic()
+		if outcome is None :
+			return None
+		self.cmdargs.model.tests += 1
+		if job.speculative :
+			self.cmdargs.model.speculative += 1
+		NB_PROCESS += 1
+		OUTCOME_CACHE.add(job.key, job.outcome, job.verdict)
+		if RUN_LOG is not None :
+			RUN_LOG.add(job)
+	
+	# answers the next test of the model if no reduction runs, and wakes the reductions waiting, that count as running again
+	def step(self) :
+		if self.cmdargs.model is None or self.active != 0 or len(self.blocked) == 0 :
+			return None
+		try :
+			self.answer(*self.cmdargs.model.next_answer(self))
+			self.answered += 1
+		except ModelError as e :
+			self.error = e
+		self.active += len(self.blocked)
+		self.blocked.clear()
+		self.condition.notify_all()
+	
+	# waits for a change of the tests, with the condition held
+	# with a model, the thread does not count as running meanwhile, and the last one to wait has the next test answered
+	def block(self) :
+		if self.cmdargs.model is None :
+			self.condition.wait()
+			return None
+		thread = threading.get_ident()
+		self.blocked.add(thread)
+		self.active -= 1
+		self.step()
+		while thread in self.blocked and self.error is None and not self.closed :
+			self.condition.wait()
+	
+	# counts the reductions that the thread starts in nbthreads other threads, until they end
+	# returns their ReductionGroup
+	def fork(self, nbreductions, nbthreads) :
+		with self.condition :
+			group = ReductionGroup(nbreductions, nbthreads)
+			self.active += group.running
+			return group
+	
+	# the thread that started the reductions of the group waits for their end, it counts as running again at their end
+	def park(self, group) :
+		with self.condition :
+			if group.running != 0 :
+				group.parked = True
+				self.active -= 1
+				self.step()
+	
+	# a reduction of the group ends, its thread runs the next one if there is one
+	def leave(self, group) :
+		with self.condition :
+			if group.queued != 0 :
+				group.queued -= 1
+				return None
+			group.running -= 1
+			self.active -= 1
+			if group.running == 0 and group.parked :
+				group.parked = False
+				self.active += 1
+			self.step()
+	
+	# returns the first Job with the desired output among the ones of the lowest rank
+	# a Job of a rank is returned once the Jobs of the lower ranks are done without the desired output, None if no Job gives it
+	# the other tests are cancelled if no reduction waits for them
+	def wait_first(self, jobs, ranks=None) :
+		if ranks is None :
+			ranks = [0 for x in jobs]
+
+		with self.condition :
+			while True :
+				if self.error is not None :
+					raise self.error
+				if self.closed :
+					raise RuntimeError("The scheduler is closed.")
+				
+				firstjob = None
+				undecided = False
+				for rank in sorted(set(ranks)) :
+					level = [job for (job, r) in zip(jobs, ranks) if r == rank]
+					successes = [job for job in level if job.state == "done" and job.verdict]
+					if len(successes) != 0 :
+						firstjob = successes[0]
+						break
+					if any(job.state != "done" for job in level) :
+						undecided = True
+						break
+				
+				if firstjob is not None or not undecided :
+					break
+				self.block()
+			
+			reach_depth(max([job.depth for job in jobs if job.state == "done"], default=0))
+			for job in jobs :
+				self.release(job)
+			return firstjob
+	
+	# tells that the reduction does not wait for the jobs any more
+	def discard(self, jobs) :
+		with self.condition :
+			for job in jobs :
+				self.release(job)
+	
+	# returns True if the configuration of spbyfile modified by changes gives the desired output
+	def test(self, spbyfile, changes=None) :
+		job = self.submit(spbyfile, changes)
+		return self.wait_first([job]) is job
+	
+	# tests the configurations in advance on the free slots, and cancels the previous ones not needed any more
+	# configs is a list of (spbyfile, changes)
+	def speculate(self, configs) :
+		keys = set()
+		for (spbyfile, changes) in configs :
+			keys.add(self.submit(spbyfile, changes, speculative=True).key)
+
+		with self.condition :
+			obsolete = self.speculations.get(threading.get_ident(), set()) - keys
+			self.speculations[threading.get_ident()] = keys
+			for key in obsolete :
+				job = self.jobs.get(key)
+				if job is not None and job.refs == 0 and not self.speculated(key) :
+					self.cancel(job)
+	
+	# forgets the last speculation of the reduction of the thread, that ends, and cancels its tests no other reduction needs
+	def end_speculation(self) :
+		with self.condition :
+			for key in self.speculations.pop(threading.get_ident(), set()) :
+				job = self.jobs.get(key)
+				if job is not None and job.refs == 0 and not self.speculated(key) :
+					self.cancel(job)
+	
+	# returns True if a reduction speculates the configuration of the key
+	def speculated(self, key) :
+		return any(key in keys for keys in self.speculations.values())
+	
+	def release(self, job) :
+		job.refs -= 1
+		if job.refs <= 0 and job.state in ("pending", "writing", "running") and not self.speculated(job.key) :
+			self.cancel(job)
+	
+	def cancel(self, job) :
+		if self.jobs.get(job.key) is job :
+			del self.jobs[job.key]
+		if job.state == "pending" :
+			(self.speculative if job.speculative else self.pending).remove(job)
+			job.state = "cancelled"
+		# its slot is freed once its files are written
+		elif job.state == "writing" :
+			job.state = "cancelled"
+		elif job.state == "running" and not job.process.killed :
+			job.process.killed = True
+			kill_process_group(job.process)
+	
+	# interrupts a running speculative test to free its slot, it will be run again later
+	def preempt(self) :
+		for job in reversed(self.running) :
+			if job.speculative and not job.process.killed :
+				self.cancel(job)
+				requeued = Job(job.key, job.snapshot, True, job.stage)
+				requeued.depth = job.depth
+				self.jobs[job.key] = requeued
+				self.speculative.appendleft(requeued)
+				return True
+		return False
+	
+	# returns a free slot: None for this node, the RemoteWorker of a remote one, False if there is none
+	def free_slot(self) :
+		if len(self.writing) + sum(1 for job in self.running if not isinstance(job.process, RemoteCall)) < self.localslots :
+			return None
+		for worker in self.remotes :
+			if len(worker.calls) < worker.slots :
+				return worker
+		return False
+	
+	# launches the waited tests first, then the speculative ones, on the free slots
+	def dispatch(self) :
+		nbfree = self.nbslots - len(self.writing) - sum(1 for job in self.running if not job.process.killed)
+		while len(self.pending) > nbfree and self.preempt() :
+			nbfree += 1
+		while len(self.pending) != 0 or len(self.speculative) != 0 :
+			worker = self.free_slot()
+			if worker is False :
+				break
+			job = self.pending.popleft() if len(self.pending) != 0 else self.speculative.popleft()
+			self.launch(job, worker)
+	
+	# sends the configuration to the RemoteWorker, or has its files written in a directory by a thread of the writepool
+	# the command is launched by the thread of the scheduler once the files are written
+	def launch(self, job, worker=None) :
+		launched = monotonic()
+		(name, submitted, end) = job.phases[0]
+		job.phases[0] = (name, submitted, launched)
+		if worker is not None :
+			p = worker.call(job.snapshot, self.cmdargs)
+			job.phases.append(("send", launched, monotonic()))
+			self.start(job, p)
+			return None
+		job.dirname = WORKDIRS.acquire()
+		job.state = "writing"
+		self.writing.append(job)
+		self.writepool.submit(self.write, job, launched)
+	
+	# writes the files of the job, or prepares its streams, without holding the lock
+	# the job is then handed back to the thread of the scheduler, with the exception raised if any
+	def write(self, job, launched) :
+		streams = list()
+		error = None
+		try :
+			if self.cmdargs.io == "file" :
+				sp_to_files(job.snapshot, self.cmdargs, job.dirname)
 			else :
-				imax = imid
-
-		# else the cut doesn't maintain the output, so we keep cutting toward the exterior
+				streams = sp_to_streams(job.snapshot, self.cmdargs, job.dirname)
+		except BaseException as e :
+			error = e
+		with self.condition :
+			job.phases.append(("write", launched, monotonic()))
+			self.written.append((job, streams, error))
+			self.wake()
+	
+	# launches the commands of the jobs whose files are written, the ones cancelled meanwhile free their directory
+	def launch_written(self) :
+		while len(self.written) != 0 :
+			(job, streams, error) = self.written.popleft()
+			self.writing.remove(job)
+			if error is not None :
+				raise error
+			if job.state == "cancelled" :
+				WORKDIRS.release(job.dirname)
+				continue
+			if self.workers is not None :
+				p = OracleCall(self.workers.pop())
+				p.worker.connection.send((str(Path(job.dirname).resolve()), self.cmdargs.fileregister[self.cmdargs.infilename]))
+				self.selector.register(p.worker.connection, selectors.EVENT_READ, (p, "oracle"))
+			else :
+				p = self.spawn(job.dirname)
+				watch_process(p, self.selector, self.cmdargs.desired_output)
+			job.phases.append(("spawn", job.phases[-1][2], monotonic()))
+			self.start(job, p, streams)
+	
+	# the job runs in the process p, the streams being written while the command reads them
+	def start(self, job, p, streams=()) :
+		global NB_PROCESS
+		p.start = monotonic()
+		for (iseqs, inputfilename, output) in streams :
+			if output is None :
+				output = os.dup(p.stdin.fileno())
+				p.stdin.close()
+			thread = threading.Thread(target=stream_iseqs, args=(iseqs, inputfilename, output), daemon=True)
+			thread.start()
+			job.writers.append((thread, output))
+		NB_PROCESS += 1
+		
+		job.process = p
+		job.start = p.start
+		job.state = "running"
+		job.lane = min(self.freelanes) if len(self.freelanes) != 0 else len(self.running)
+		self.freelanes.discard(job.lane)
+		self.running.append(job)
+	
+	# launches the command in the directory, without the shell when it is not needed
+	def spawn(self, dirname) :
+		stdin = PIPE if self.cmdargs.io == "stdin" else None
+		if self.cmdargs.argv is not None :
+			try :
+				return PopenExtended(self.cmdargs.argv, executable=self.cmdargs.executable, cwd=dirname, env=self.cmdargs.env, stdin=stdin, stdout=PIPE, stderr=PIPE, start_new_session=True)
+			# the shell reports a program not found in its output and returncode
+			except OSError :
+				pass
+		return PopenExtended(self.cmdargs.subcmdline_replaced, shell=True, cwd=dirname, env=self.cmdargs.env, stdin=stdin, stdout=PIPE, stderr=PIPE, start_new_session=True)
+	
+	# waits until the job is done or cancelled, without telling that the reduction does not wait for it any more
+	def wait_end(self, job) :
+		with self.condition :
+			while job.state not in ("done", "cancelled") :
+				if self.error is not None :
+					raise self.error
+				if self.closed :
+					raise RuntimeError("The scheduler is closed.")
+				self.condition.wait()
+	
+	# waits for the end of the writers of the ended test
+	# a writer waiting for the command to open its fifo is released by opening it, the command being dead
+	def stop_writers(self, job) :
+		for (thread, output) in job.writers :
+			if thread.is_alive() and isinstance(output, str) :
+				os.close(os.open(output, os.O_RDONLY | os.O_NONBLOCK))
+			thread.join()
+	
+	# finalizes the termination of the process of the job
+	def finish(self, job) :
+		p = job.process
+		ended = monotonic()
+		self.freelanes.add(job.lane)
+		# the test of a disconnected worker is run again
+		if isinstance(p, RemoteCall) and p.lost :
+			job.process = None
+			self.running.remove(job)
+			job.phases = [("queued", ended, None)]
+			job.state = "pending"
+			(self.speculative if job.speculative else self.pending).appendleft(job)
+			return None
+		if isinstance(p, RemoteCall) :
+			pass
+		elif isinstance(p, OracleCall) :
+			# a killed worker is replaced, even if it sent its result before being killed
+			if p.killed or p.timedout or p.returncode < 0 :
+				p.worker.close()
+				p.worker = OracleWorker(self.cmdargs.oracle)
+			self.workers.append(p.worker)
 		else :
-			# keep the most external quarter
-			seq1 = (imin, end) if flag_begining else (begin, imax)
-			if flag_begining :
-				imax = imid
+			for pipe in (p.stdout, p.stderr) :
+				if self.selector.get_map().get(pipe.fileno()) is not None :
+					self.selector.unregister(pipe)
+				pipe.close()
+		self.stop_writers(job)
+		self.running.remove(job)
+		if job.dirname is not None :
+			WORKDIRS.release(job.dirname)
+		job.end = monotonic()
+		job.phases.append(("command", p.start, ended))
+		job.phases.append(("cleanup", ended, job.end))
+		
+		# the outcome of an interrupted process is unknown
+		if p.killed :
+			job.state = "cancelled"
+		else :
+			if isinstance(p, RemoteCall) :
+				if p.timedout :
+					process_outcome(p, self.cmdargs)
+			elif isinstance(p, OracleCall) :
+				oracle_outcome(p, self.cmdargs)
 			else :
-				imin = imid
+				process_outcome(p, self.cmdargs)
+			job.outcome = p.outcome
+			job.verdict = p.verdict
+			job.state = "done"
+			OUTCOME_CACHE.add(job.key, job.outcome, job.verdict)
+		if self.jobs.get(job.key) is job :
+			del self.jobs[job.key]
+		if TRACER is not None :
+			TRACER.add_job(job)
+		if RUN_LOG is not None :
+			RUN_LOG.add(job)
+	
+	def loop(self) :
+		try :
+			while True :
+				with self.condition :
+					if self.closed :
+						break
+					self.launch_written()
+					if self.cmdargs.model is None :
+						self.dispatch()
+					waiting = interrupt_late_processes([job.process for job in self.running], self.cmdargs.timeout)
+					if any(job.process.pidfd is None for job in self.running) :
+						waiting = POLL_PERIOD if waiting is None else min(waiting, POLL_PERIOD)
+				
+				events = self.selector.select(waiting)
+				
+				with self.condition :
+					for (key, mask) in events :
+						if key.data == "wakeup" :
+							os.read(self.wakeupread, READ_SIZE)
+						elif key.data == "listen" :
+							self.accept()
+						elif key.data[1] == "remote" :
+							if not handle_remote_event(key.data[0], self.cmdargs) :
+								self.disconnect(key.data[0])
+						elif key.data[1] == "oracle" :
+							handle_oracle_event(key, self.selector, self.cmdargs.desired_output)
+						else :
+							handle_event(key, self.selector, self.cmdargs.desired_output)
+					for job in [job for job in self.running if process_ended(job.process)] :
+						self.finish(job)
+					self.condition.notify_all()
+		
+		except BaseException as e :
+			with self.condition :
+				self.error = e
+				self.condition.notify_all()
+	
+	# adds the slots of a worker that connects, once it said hello
+	def accept(self) :
+		(connection, address) = self.listener.accept()
+		worker = RemoteWorker(connection, address)
+		self.remotes.append(worker)
+		self.selector.register(connection, selectors.EVENT_READ, (worker, "remote"))
+	
+	def disconnect(self, worker) :
+		self.selector.unregister(worker.connection)
+		self.remotes.remove(worker)
+		worker.close()
+		if self.cmdargs.verbose and worker.slots != 0 :
+			print("Worker " + str(worker.address) + " disconnected")
+	
+	# kills the running tests and stops the thread
+	def close(self) :
+		with self.condition :
+			self.closed = True
+			for job in self.running :
+				job.process.killed = True
+				kill_process_group(job.process)
+			self.wake()
+			self.condition.notify_all()
+		self.thread.join()
+		self.writepool.shutdown(cancel_futures=True)
+		for job in self.running :
+			if isinstance(job.process, RemoteCall) :
+				continue
+			if isinstance(job.process, OracleCall) :
+				job.process.worker.close()
+				continue
+			job.process.wait()
+			job.process.stdout.close()
+			job.process.stderr.close()
+		for worker in self.workers or [] :
+			worker.close()
+		# the workers end when their connection is closed
+		for worker in self.remotes :
+			worker.close()
+		if self.listener is not None :
+			self.listener.close()
+		self.selector.close()
+		os.close(self.wakeupread)
+		os.close(self.wakeupwrite)
+
+
+SCHEDULER = None # Scheduler of the run
+
+
+# runs the command on the whole input, even if its outcome is stored
+# returns the verdict and the duration of the run
+@traced_stage
+def run_baseline(spbyfile, cmdargs) :
+	job = SCHEDULER.submit(spbyfile, force=True)
+	SCHEDULER.wait_first([job])
+	return (job.verdict, job.end - job.start)
+
+
+# tests in advance the removals that follow the i-th one of the list, on the free slots
+# removals is a list of changes, the tests assume the i-th removal first succeeds, then fails
+def speculate_removals(spbyfile, removals, i) :
+	nbspeculative = SCHEDULER.nbslots - 1
+	configs = list()
+	changes = dict(removals[i])
+	for j in range(i+1, len(removals)) :
+		if len(configs) >= nbspeculative :
+			break
+		changes = {**changes, **removals[j]}
+		configs.append((spbyfile, changes))
+		if j == i+1 and len(configs) < nbspeculative :
+			configs.append((spbyfile, removals[j]))
+	SCHEDULER.speculate(configs)
+
+
+# reduces the sequence, cutting first and last nucleotides
+# with an iterative k-ary search, testing nbprobes cuts at once that divide the interval in nbprobes+1 parts
+# others are the other subseqs of the specie
+# bounds is the [begin, end] of the sequence shared with the search of the other end, that may move it meanwhile
+# returns the new reduced sequence, WITHOUT ADDING IT TO THE SPECIE'S LIST OF SEQS
+@traced_stage
+def strip_sequence(seq, sp, others, spbyfile, flag_begining, cmdargs, nbprobes=1, bounds=None) :
+	if bounds is None :
+		bounds = list(seq)
+	
+	# the sequence kept when cutting at i, the other end being at other
+	cut = lambda i, other : (i, other) if flag_begining else (other, i)
 	
-		imid = (imin+imax) // 2
+	# the cut at good keeps the output, the cut at bad does not
+	(good, bad) = (seq[0], seq[1]) if flag_begining else (seq[1], seq[0])
+	
+	while True :
+		
+		# the other end is held at its current best cut, a cut beyond it would leave nothing
+		other = bounds[1] if flag_begining else bounds[0]
+		bad = min(bad, other) if flag_begining else max(bad, other)
+		if abs(bad - good) <= 1 :
+			break
+
+		# cuts from the good one toward the bad one
+		probes = list()
+		for i in range(1, nbprobes+1) :
+			probe = good + (bad - good) * i // (nbprobes+1)
+			if probe != good and probe != bad and probe not in probes :
+				probes.append(probe)
+		jobs = [SCHEDULER.submit(spbyfile, {sp : others + [cut(probe, other)]}) for probe in probes]
+
+		# the first cut that does not keep the output bounds the search, the cuts after it are not needed
+		for (i, (probe, job)) in enumerate(zip(probes, jobs)) :
+			if SCHEDULER.wait_first([job]) is job :
+				good = probe
+				bounds[0 if flag_begining else 1] = good
+			else :
+				bad = probe
+				SCHEDULER.discard(jobs[i+1:])
+				break
 	
-	return seq1
+	return cut(good, bounds[1] if flag_begining else bounds[0])
+
+
+# reduces the sequence from both ends at once, the slots being shared between the two searches
+# the search of the last nucleotides runs in a thread, and the sequence they find together is tested at the end
+# returns the new reduced sequence, WITHOUT ADDING IT TO THE SPECIE'S LIST OF SEQS
+def strip_both_ends(seq, sp, others, spbyfile, cmdargs) :
+	if SCHEDULER.nbslots == 1 :
+		seq = strip_sequence(seq, sp, others, spbyfile, True, cmdargs)
+		return strip_sequence(seq, sp, others, spbyfile, False, cmdargs)
+	
+	bounds = list(seq)
+	nbprobes = SCHEDULER.nbslots // 2
+	errors = list()
+	depths = list()
+	
+	def strip_end(depth, group) :
+		try :
+			depths.append(run_at_depth(lambda : strip_sequence(seq, sp, others, spbyfile, False, cmdargs, nbprobes, bounds), depth, group)[1])
+		except BaseException as e :
+			errors.append(e)
+	
+	group = SCHEDULER.fork(1, 1)
+	thread = threading.Thread(target=strip_end, args=(path_depth(), group), daemon=True)
+	thread.start()
+	strip_sequence(seq, sp, others, spbyfile, True, cmdargs, nbprobes, bounds)
+	SCHEDULER.park(group)
+	thread.join()
+	if len(errors) != 0 :
+		raise errors[0]
+	reach_depth(depths[0])
+
+	# each end was tested with the other one at a former cut, so they may not keep the output together
+	(begin, end) = bounds
+	if begin < end and SCHEDULER.test(spbyfile, {sp : others + [(begin, end)]}) :
+		return (begin, end)
+	# then the last nucleotides are searched again after the first ones
+	return strip_sequence((begin, seq[1]), sp, others, spbyfile, False, cmdargs, SCHEDULER.nbslots)
+
+
+# returns the k chunks of the sequence, of equal lengths give or take one
+def split_sequence(seq, k) :
+	(begin, end) = seq
+	bounds = [begin + (end - begin) * i // k for i in range(k + 1)]
+	return [(bounds[i], bounds[i+1]) for i in range(k)]
+
+
+RANK_STAGES = ["reduce_specie:chunk", "reduce_specie:complement", "reduce_specie:apart"] # stages of the candidates of reduce_specie by rank
 
 
 # reduces the sequences of the specie and puts it in the list spbyfile
-# use an iterative binary search, returns nothing
+# use an iterative k-ary search, returns nothing
+@traced_stage
 def reduce_specie(sp, spbyfile, cmdargs) :
 	
-	tmpsubseqs = sp.subseqs.copy()
+	spid = (sp.filename, sp.begin_seq)
+	if spid in PROGRESS.reduced :
+		return None
+	tmpsubseqs = PROGRESS.pending.get(spid, sp.subseqs).copy()
 	
 	while tmpsubseqs : # while set not empty
 		
+		with STATE_LOCK :
+			PROGRESS.pending[spid] = tmpsubseqs.copy()
+		save_checkpoint(spbyfile)
 		seq = tmpsubseqs.pop() # take an arbitrary sequence of the specie
-		sp.subseqs.remove(seq)
+		others = sp.subseqs.copy()
+		others.remove(seq)
 		(begin, end) = seq
 
-		middle = (seq[0] + seq[1]) // 2		
-		seq1 = (begin, middle)
-		seq2 = (middle, end)
-
-		# prepare the files and directories needed to check if they pass the test
-		sp.subseqs.append(seq1)
-		dirname1 = prepare_dir(spbyfile, cmdargs)
-		sp.subseqs.remove(seq1)		
-
-		sp.subseqs.append(seq2)
-		dirname2 = prepare_dir(spbyfile, cmdargs)
-
-		sp.subseqs.append(seq1)
-		dirname3 = prepare_dir(spbyfile, cmdargs)
-		sp.subseqs.remove(seq1)
-		sp.subseqs.remove(seq2)
-
-		dirnames = list()
-		priorities = list()
-		if middle != end :
-			dirnames.append(dirname1)
-			priorities.append(True)
-		if middle != begin :
-			dirnames.append(dirname2)
-			priorities.append(True)
-		if middle != end and middle != begin :
-			dirnames.append(dirname3)
-			priorities.append(False)
+		# the k chunks of the sequence, some are empty if it is shorter than k
+		chunks = split_sequence(seq, cmdargs.nbchunks)
+		pieces = [chunk for chunk in chunks if chunk[0] != chunk[1]]
+
+		# the candidates replacing the sequence, with their rank : each chunk alone first,
+		# then the sequence without each chunk, then all the chunks apart
+		# an empty chunk alone removes the sequence
+		candidates = list()
+		for chunk in chunks :
+			subseqs = [chunk] if chunk[0] != chunk[1] else []
+			if chunk != seq and (subseqs, 0) not in candidates :
+				candidates.append((subseqs, 0))
+		if cmdargs.nbchunks > 2 :
+			for chunk in pieces :
+				complement = [x for x in ((begin, chunk[0]), (chunk[1], end)) if x[0] != x[1]]
+				candidates.append((complement, 1))
+		if len(pieces) > 1 :
+			candidates.append((pieces, 2))
+		jobs = [SCHEDULER.submit(spbyfile, {sp : others + subseqs}, stage=RANK_STAGES[rank] if TRACER is not None else None) for (subseqs, rank) in candidates]
 		
-		#print("nombre de proc simultannés : ", len(dirnames))
+		# tests in advance the chunks of the chunks, needed next if one chunk keeps the output
+		if SCHEDULER.nbslots > 1 :
+			configs = list()
+			for chunk in pieces :
+				for subchunk in split_sequence(chunk, cmdargs.nbchunks) :
+					if subchunk[0] != subchunk[1] and subchunk != chunk :
+						configs.append((spbyfile, {sp : others + [subchunk]}))
+			SCHEDULER.speculate(configs[:SCHEDULER.nbslots - 1])
 		
-		firstdirname = trigger_and_wait_processes(cmdargs, dirnames, priorities)
-		rmtree(dirname1)
-		rmtree(dirname2)
-		rmtree(dirname3)
-
-		# TODO : utiliser des elif au lieu des continue ?
-		# case where the target fragment is in the first half
-		if firstdirname is not None and firstdirname == dirname1 :
-			#print("case 1")
-			sp.subseqs.append(seq1)
-			tmpsubseqs.append(seq1)
-			continue
-		
-		# case where the target fragment is in the second half
-		if firstdirname is not None and firstdirname == dirname2 :
-			#print("case 2")
-			sp.subseqs.append(seq2)
-			tmpsubseqs.append(seq2)
-			continue
+		#print("nombre de proc simultannés : ", len(jobs))
 		
-		# case where there are two co-factor sequences
-		# so we cut the seq in half and add them to the set to be reduced
+		firstjob = SCHEDULER.wait_first(jobs, [rank for (subseqs, rank) in candidates])
+
+		# case where the target fragments are in a chunk, in the other chunks, or in several chunks
+		# so the subseqs of the candidate replace the sequence and are reduced in turn
 		# TODO : relancer le check_output pour trouver les co-factors qui ne sont pas de part et d'autre du milieu de la séquence
-		if firstdirname is not None and firstdirname == dirname3 :
-			#print("case 3")
-			sp.subseqs.append(seq1)
-			sp.subseqs.append(seq2)
-			tmpsubseqs.append(seq1)
-			tmpsubseqs.append(seq2)
+		# the subseqs and the progression are changed together, a checkpoint of another reduction may save them meanwhile
+		if firstjob is not None :
+			subseqs = candidates[jobs.index(firstjob)][0]
+			with STATE_LOCK :
+				sp.subseqs = others + subseqs
+				tmpsubseqs.extend(subseqs)
+				PROGRESS.pending[spid] = tmpsubseqs.copy()
 			continue
 		
-		# case where the target sequence is on both sides of the cut
+		# case where the target sequence is on both sides of a cut
 		# so we strip first and last unnecessary nucleotids
 		#print("case 4")
-		seq = strip_sequence(seq, sp, spbyfile, True, cmdargs)
-		seq = strip_sequence(seq, sp, spbyfile, False, cmdargs)
-		sp.subseqs.append(seq)
+		seq = strip_both_ends(seq, sp, others, spbyfile, cmdargs)
+		with STATE_LOCK :
+			sp.subseqs = others + [seq]
+			PROGRESS.pending[spid] = tmpsubseqs.copy()
 	
+	with STATE_LOCK :
+		del PROGRESS.pending[spid]
+		PROGRESS.reduced.add(spid)
+	save_checkpoint(spbyfile, True)
 	return None
 
 
-# returns every reduced sequences of a file in a list of SpecieData
-def reduce_one_file(iseqs, spbyfile, cmdargs) :
-	copy_iseqs = iseqs.copy()
+# removes the items that are not needed, testing their removal one by one
+# removal(item) returns the changes of spbyfile removing the item, remove(item) removes it and keep(item) records it is needed
+@traced_stage
+def remove_one_by_one(spbyfile, items, removal, remove, keep) :
+	removals = [removal(item) for item in items]
 
-	for sp in copy_iseqs :
-		# check if desired output is obtained whithout the sequence of the specie
-		iseqs.remove(sp)
-		
-		dirname = prepare_dir(spbyfile, cmdargs)
-		firstdirname = trigger_and_wait_processes(cmdargs, [dirname])
-		rmtree(dirname)
+	for (i, item) in enumerate(items) :
+		if SCHEDULER.nbslots > 1 :
+			speculate_removals(spbyfile, removals, i)
+
+		# check if desired output is obtained whithout the item
+		verdict = SCHEDULER.test(spbyfile, removals[i])
+		with STATE_LOCK :
+			if verdict :
+				remove(item)
+			# otherwise the item is needed
+			else :
+				keep(item)
+		save_checkpoint(spbyfile)
+
+
+# removes the items that are not needed, testing the removal of groups of items
+# a group whose removal loses the desired output is split in two halves, tested later, down to single items
+# the groups are tested nbslots at once, removal, remove and keep are the functions of remove_one_by_one
+@traced_stage
+def remove_by_groups(spbyfile, items, removal, remove, keep) :
+	groups = deque([items]) if len(items) != 0 else deque()
+
+	while len(groups) != 0 :
+		batch = [groups.popleft() for i in range(min(SCHEDULER.nbslots, len(groups)))]
+		jobs = list()
+		for group in batch :
+			changes = dict()
+			for item in group :
+				changes.update(removal(item))
+			jobs.append(SCHEDULER.submit(spbyfile, changes))
+		removed = False
+		retested = list()
+
+		for (group, job) in zip(batch, jobs) :
+			if SCHEDULER.wait_first([job]) is job :
+				# the other groups were tested with the removed one, so their removal is tested again
+				if removed :
+					retested.append(group)
+					continue
+				with STATE_LOCK :
+					for item in group :
+						remove(item)
+				removed = True
+			# the item is needed
+			elif len(group) == 1 :
+				with STATE_LOCK :
+					keep(group[0])
+			# a part of the group is needed
+			else :
+				middle = len(group) // 2
+				groups.append(group[:middle])
+				groups.append(group[middle:])
+
+		groups.extendleft(reversed(retested))
+		save_checkpoint(spbyfile)
 
-		if firstdirname is None :
-			# otherwise reduces the sequence
-			iseqs.append(sp)
 
-	for sp in iseqs :
-		reduce_specie(sp, spbyfile, cmdargs)
+# runs the reductions at once, each one testing its candidates with the current state of the others
+# the state they reach together is tested at the end, and if it loses the desired output they are run again one after the other
+# reductions is a list of functions, species the list of the species they modify, and removal is True if they remove species
+@traced_stage
+def reduce_concurrently(spbyfile, reductions, species, removal) :
+	saved = [(iseqs, list(iseqs)) for iseqs in spbyfile]
+	savedsubseqs = [(sp, sp.subseqs) for sp in species]
+
+	executor = ThreadPoolExecutor(SCHEDULER.nbslots)
+	group = SCHEDULER.fork(len(reductions), SCHEDULER.nbslots)
+	try :
+		futures = [executor.submit(run_at_depth, reduction, path_depth(), group) for reduction in reductions]
+		SCHEDULER.park(group)
+		for future in futures :
+			reach_depth(future.result()[1])
+	finally :
+		executor.shutdown(wait=False, cancel_futures=True)
+	
+	if SCHEDULER.test(spbyfile) :
+		return None
+	
+	# restores the state before the reductions, and forgets their progression
+	with STATE_LOCK :
+		for (iseqs, saved_iseqs) in saved :
+			iseqs[:] = saved_iseqs
+		for (sp, subseqs) in savedsubseqs :
+			sp.subseqs = subseqs
+			PROGRESS.forget(sp, removal)
+	for reduction in reductions :
+		reduction()
+
+
+# returns every reduced sequences of a file in a list of SpecieData
+@traced_stage
+def reduce_one_file(iseqs, spbyfile, cmdargs) :
+	filename = iseqs[0].filename if len(iseqs) != 0 else None
+
+	if filename not in PROGRESS.removed_from :
+		untested = [sp for sp in iseqs if (sp.filename, sp.begin_seq) not in PROGRESS.tested]
+		removal_pass = remove_by_groups if cmdargs.group_removal else remove_one_by_one
+		removal_pass(spbyfile, untested, lambda sp : {sp : None}, iseqs.remove, lambda sp : PROGRESS.tested.add((sp.filename, sp.begin_seq)))
+		with STATE_LOCK :
+			PROGRESS.removed_from.add(filename)
+		save_checkpoint(spbyfile, True)
+
+	# the species are reduced at once when there are several slots
+	reductions = [lambda sp=sp : reduce_specie(sp, spbyfile, cmdargs) for sp in iseqs]
+	if SCHEDULER.nbslots > 1 and len(iseqs) > 1 :
+		reduce_concurrently(spbyfile, reductions, list(iseqs), False)
+	else :
+		for reduction in reductions :
+			reduction()
 		
 	return iseqs
 
 
+@traced_stage
 def reduce_all_files(spbyfile, cmdargs) :
 	
 	if len(spbyfile) == 1 :
 		reduce_one_file(spbyfile[0], spbyfile, cmdargs)
 		return spbyfile
 	
-	copy_spbyfile = spbyfile.copy()
+	if not PROGRESS.files_removed :
+		untested = [iseqs for iseqs in spbyfile if len(iseqs) != 0 and iseqs[0].filename not in PROGRESS.tested]
+		removal_pass = remove_by_groups if cmdargs.group_removal else remove_one_by_one
+		removal_pass(spbyfile, untested, lambda iseqs : dict((sp, None) for sp in iseqs), spbyfile.remove, lambda iseqs : PROGRESS.tested.add(iseqs[0].filename))
+		PROGRESS.files_removed = True
+		save_checkpoint(spbyfile, True)
+
+	# the files are reduced at once when there are several slots
+	reductions = [lambda iseqs=iseqs : reduce_one_file(iseqs, spbyfile, cmdargs) for iseqs in spbyfile]
+	if SCHEDULER.nbslots > 1 :
+		reduce_concurrently(spbyfile, reductions, [sp for iseqs in spbyfile for sp in iseqs], True)
+	else :
+		for reduction in reductions :
+			reduction()
 
-	for iseqs in copy_spbyfile :
-		# check if desired output is obtained whithout the file
-		spbyfile.remove(iseqs)
+	return spbyfile
 
-		dirname = prepare_dir(spbyfile, cmdargs)
-		firstdirname = trigger_and_wait_processes(cmdargs, [dirname])
-		rmtree(dirname)
 
-		if firstdirname is None :
-			# otherwise reduces the sequences of the file
-			spbyfile.append(iseqs)
-
-	for iseqs in spbyfile :
-		reduce_one_file(iseqs, spbyfile, cmdargs)
-
-	return spbyfile
+# returns the LineIndex of the seq between the offsets begin (included) and end (excluded) of the mapped file
+def index_line_breaks(mm, begin, end) :
+	first = mm.find(b'\n', begin, end)
+	if first == -1 :
+		return LineIndex(begin, array('q'))
+	width = first - begin
+
+	# counts the lines of the same width as the first one, looking only at the bytes where their breaks should be
+	nregular = 0
+	if width > 0 :
+		pos = first
+		while pos < end :
+			expected = mm[pos:min(end, pos + SCAN_SIZE):width+1]
+			nlines = len(expected) - len(expected.lstrip(b'\n'))
+			nregular += nlines
+			if nlines < len(expected) :
+				break
+			pos += len(expected) * (width+1)
+
+		# the regular lines must not contain any other line break
+		nbreaks = 0
+		regularend = begin + nregular * (width+1)
+		for pos in range(begin, regularend, SCAN_SIZE) :
+			nbreaks += mm[pos:min(regularend, pos + SCAN_SIZE)].count(b'\n')
+		if nbreaks != nregular :
+			nregular = 0
+
+	# the remaining line breaks are indexed one by one
+	breaks = array('q')
+	pos = mm.find(b'\n', begin + nregular * (width+1), end)
+	while pos != -1 :
+		breaks.append(pos)
+		pos = mm.find(b'\n', pos+1, end)
+	
+	return LineIndex(begin, breaks, width, nregular)
 
 
 # returns the representation of a fasta file parsed in a list of SpecieData
-# they contain the index of the first and last characteres of the sequence in the file
+# they contain the offsets of the first and last bytes of the sequence in the file
 # the first is included and the last is excluded
+# the file is mapped in memory and the headers are found with bulk searches
 def parsing(filename) :
 	try :
-		with open(filename, 'r') as f :
-			header = None
-			specie = None
-			begin = 0
-			end = 0
+		with open(filename, 'rb') as f :
 			sequences = list()
-			c = 0
-
-			for line in f :
+			size = os.fstat(f.fileno()).st_size
+			if size == 0 :
+				return sequences
+			
+			with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm :
+				
+				# the headers are the lines beginning with '>'
+				pos = 0 if mm[0:1] == b'>' else mm.find(b'\n>')
+				if pos > 0 :
+					pos += 1
 				
-				c += len(line)
-				if line[0] == '>' :
+				while pos != -1 :
+					eol = mm.find(b'\n', pos)
+					if eol == -1 :
+						eol = size
+					header = mm[pos+1:eol].rstrip(b'\r').decode(errors="surrogateescape")
+					begin = min(eol+1, size)
 					
-					if header != None :
-						end = c - len(line) - 1
-						specie = SpecieData(header, begin, end, filename)
-						sequences.append(specie)
+					# the seq ends before the line break preceding the next header
+					nextheader = mm.find(b'\n>', eol)
+					end = max(begin, nextheader) if nextheader != -1 else size
 					
-					header = line[1:].rstrip('\n')
-					begin = c
-					end = c+1
-				
-		# adds the last seq to the set
-		end = c
-		specie = SpecieData(header, begin, end, filename)
-		sequences.append(specie)
+					specie = SpecieData(header, begin, end, filename, index_line_breaks(mm, begin, end))
+					sequences.append(specie)
+					pos = nextheader + 1 if nextheader != -1 else -1
+		
 		sequences.sort(key=lambda x:x.subseqs[0][1] - x.subseqs[0][0], reverse=True) # order by seq length from bigger to smaller, to minimize bigger sequences in first
 		return sequences
 
@@ -554,6 +2542,27 @@ def fof_to_list(fofname) :
 		raise
 
 
+# returns the number of processors this process may run on, which is lower than the count of the host in a container
+def available_cpus() :
+	if hasattr(os, "sched_getaffinity") :
+		return len(os.sched_getaffinity(0))
+	return os.cpu_count() or 1
+
+
+# raises SystemExit in the main thread on a signal ending the run, so that its tests are killed and its directories removed
+# the signals sent again, as to the whole process group, are ignored to not interrupt this cleanup
+def terminate(signum, frame) :
+	for other in TERMINATING_SIGNALS :
+		signal.signal(other, signal.SIG_IGN)
+	raise SystemExit(128 + signum)
+
+
+# stops the run on an error of its input, printed as the errors of the arguments
+def exit_error(message) :
+	print("Genome Fuzzing: error: " + message, file=sys.stderr)
+	sys.exit(2)
+
+
 # prepare the argument parser and parses the command line
 # returns an argparse.Namespace object
 def set_args() :
@@ -562,18 +2571,72 @@ def set_args() :
 	# non positionnal arguments
 	parser.add_argument('-e', '--stderr', default=None)
 	parser.add_argument('-f', '--onefasta', action='store_true')
+	parser.add_argument('-j', '--jobs', default=available_cpus(), type=int, help="number of tests run at once, the free ones test in advance the next candidates, the processors this process may use by default")
+	parser.add_argument('--one-by-one', action='store_true', help="tests the removal of the species one by one instead of by groups")
+	parser.add_argument('-k', '--chunks', default=None, type=int, help="number of chunks a sequence is split in at each step, computed from --jobs by default")
+	parser.add_argument('--io', default="file", choices=["file", "stdin", "fifo"], help="gives the sequences to the command in files, on its standard input, or in named pipes")
+	parser.add_argument('--oracle', default=None, help="python function called on the input file instead of the command, as module:function or path.py:function")
+	parser.add_argument('--listen', default=None, help="address host:port where the workers of other nodes connect to run tests")
+	parser.add_argument('--worker', default=None, help="runs the tests of the coordinator listening at the address host:port, with the same input and output")
 	parser.add_argument('-o', '--outfilesnames', action='extend', nargs='+', type=str, default=[])
 	parser.add_argument('-r', '--returncode', default=None, type=int)
+	parser.add_argument('-t', '--timeout', default=None, type=float, help="seconds before a test is interrupted, computed from the first run by default")
+	parser.add_argument('--timeout-factor', default=10, type=float, help="timeout of the tests relatively to the duration of the first run")
+	parser.add_argument('--timeout-desired', action='store_true', help="a test interrupted by the timeout gives the desired output")
+	parser.add_argument('-s', '--store', default=None, help="sqlite file where the tested configurations and checkpoints are saved")
+	parser.add_argument('--resume', action='store_true', help="resumes the run saved in the store")
+	parser.add_argument('--simulate', default=None, help="json model of the output, evaluated on the intervals kept instead of running a command")
+	parser.add_argument('--log', default=None, help="json lines file where every test is written, with its configuration, verdict and durations")
+	parser.add_argument('--replay', default=None, help="log of a run whose verdicts answer the tests instead of running a command")
+	parser.add_argument('--replay-partial', action='store_true', help="a configuration missing from the log of --replay does not give the desired output, instead of stopping the replay")
+	parser.add_argument('--trace', default=None, help="json file where the phases of the tests are written as a Chrome trace, with a summary printed at the end")
 	parser.add_argument('-u', '--stdout', default=None)
 	parser.add_argument('-v', '--verbose', action='store_true')
+	parser.add_argument('-w', '--workdir', default=".", help="directory where the tests are run, for example /dev/shm")
 
 	# positionnal arguments
 	parser.add_argument('filename')
-	parser.add_argument('cmdline')
+	parser.add_argument('cmdline', nargs='?', default="")
 	
 	args = parser.parse_args()
-	if not (args.returncode or args.stdout or args.stderr) :
+	if args.simulate is not None and args.replay is not None :
+		parser.error("--simulate and --replay can not be given together.")
+	if args.replay_partial and args.replay is None :
+		parser.error("--replay-partial needs the log replayed, add --replay.")
+	for (option, model) in (("--simulate", args.simulate), ("--replay", args.replay)) :
+		if model is not None and (args.oracle is not None or args.cmdline != "") :
+			parser.error(option + " replaces the command line and --oracle.")
+		if model is not None and (args.io != "file" or args.listen is not None or args.worker is not None) :
+			parser.error(option + " runs no command, it can not be given with --io, --listen or --worker.")
+	if args.oracle is None and args.cmdline == "" and args.simulate is None and args.replay is None :
+		parser.error("No command given, add the command line or --oracle.")
+	if args.oracle is not None and len(args.oracle.rsplit(":", 1)) != 2 :
+		parser.error("--oracle needs the function, as module:function or path.py:function.")
+	if args.io == "stdin" and not args.onefasta :
+		parser.error("--io stdin needs a single fasta file, add -f.")
+	if args.io == "stdin" and args.oracle is not None :
+		parser.error("--io stdin gives the sequences to a command, not to --oracle.")
+	if not (args.returncode or args.stdout or args.stderr or args.timeout_desired or args.oracle or args.simulate or args.replay) :
 		parser.error("No output requested, add -r or -e or -u.")
+	if args.timeout_desired and args.timeout is None :
+		parser.error("--timeout-desired needs the timeout of the tests, add -t.")
+	if args.jobs < 1 :
+		parser.error("--jobs needs at least one test at once.")
+	if args.chunks is not None and args.chunks < 2 :
+		parser.error("--chunks needs at least two chunks.")
+	if args.resume and args.store is None :
+		parser.error("--resume needs the store of the run, add -s.")
+	for address in (args.listen, args.worker) :
+		if address is not None and (":" not in address or not address.rsplit(":", 1)[1].isdigit()) :
+			parser.error("The address " + address + " needs a port, as host:port.")
+	if args.listen is not None and args.worker is not None :
+		parser.error("--listen and --worker can not be given together.")
+	# the oracle is loaded once here, a worker failing to load it would only be noticed by its broken pipe
+	if args.oracle is not None :
+		try :
+			load_oracle(args.oracle)
+		except Exception as e :
+			parser.error("The oracle " + args.oracle + " can not be loaded : " + repr(e))
 	
 	return args
 
@@ -583,12 +2646,31 @@ if __name__=='__main__' :
 	# set and get the arguments
 	args = set_args()
 
+	# the commands run in their own sessions, they are killed by the cleanup of the run when it is terminated
+	for signum in TERMINATING_SIGNALS :
+		signal.signal(signum, terminate)
+
 	# get the arguments
 	desired_output = (args.returncode, args.stdout, args.stderr)
 	infilename = args.filename
 	nofof = args.onefasta
 
-	cmdargs = CmdArgs(args.cmdline, infilename, nofof, args.outfilesnames, desired_output, args.verbose)
+	# the command is replaced by a model, whose genome replaces the files of the input
+	model = None
+	if args.simulate is not None :
+		model = SimulatedOracle(args.simulate)
+	if args.replay is not None :
+		model = ReplayedOracle(args.replay, args.replay_partial)
+	virtualfiles = model.virtual_files() if model is not None and model.genome is not None else None
+
+	cmdargs = CmdArgs(args.cmdline, infilename, nofof, args.outfilesnames, desired_output, args.verbose, virtualfiles)
+	cmdargs.model = model
+	cmdargs.oracle = args.oracle
+	cmdargs.io = args.io
+	cmdargs.jobs = args.jobs
+	cmdargs.group_removal = not args.one_by_one
+	# each chunk and its complement are tested at once, with all the chunks apart
+	cmdargs.nbchunks = args.chunks if args.chunks is not None else max(2, (args.jobs - 1) // 2)
 	#cmdargs.init_seqfilesnames()
 	allfiles = cmdargs.get_all_infiles()
 
@@ -597,22 +2679,102 @@ if __name__=='__main__' :
 		s += " - Fofname : " + cmdargs.infilename + "\n"
 		s += " - Input files names : " + str(cmdargs.seqfilesnames) + "\n"
 		s += " - Command : " + cmdargs.subcmdline + "\n"
+		s += " - Run by the shell : " + str(cmdargs.argv is None) + "\n"
 		print(s)
 
-	# parse the sequences of each file
-	spbyfile = parsing_multiple_files(cmdargs.seqfilesnames)
+	# parse the sequences of each file, or make the ones of the genome simulated
+	if virtualfiles is not None :
+		spbyfile = cmdargs.model.virtual_species()
+	else :
+		spbyfile = parsing_multiple_files(cmdargs.seqfilesnames)
+	# a replayed log also gives the options of its reduction
+	if cmdargs.model is not None :
+		try :
+			cmdargs.model.resolve(spbyfile, cmdargs)
+		except ModelError as e :
+			exit_error(str(e))
+	cmdargs.fingerprint = run_fingerprint(spbyfile, cmdargs)
+
+	# directories of the tests
+	WORKDIRS = WorkdirPool(args.workdir)
+	FILE_CACHE = FileCache(WORKDIRS.root + "/cache")
+
+	# persists the outcomes and restarts from the last checkpoint if asked
+	if args.store is not None :
+		STORE = OutcomeStore(args.store, cmdargs, args.resume)
+		OUTCOME_CACHE.attach(STORE)
+		if args.resume :
+			spbyfile = restore_checkpoint(spbyfile, STORE)
+	
+	# the phases of the tests are traced, and the tests logged, if asked
+	if args.trace is not None :
+		TRACER = Tracer()
+	if args.log is not None :
+		RUN_LOG = RunLog(args.log, cmdargs)
+	
+	# a worker only runs the tests of its coordinator
+	if args.worker is not None :
+		SCHEDULER = Scheduler(cmdargs, cmdargs.jobs)
+		try :
+			run_worker(args.worker, spbyfile, cmdargs)
+		finally :
+			SCHEDULER.close()
+			WORKDIRS.clear()
+			if TRACER is not None :
+				TRACER.write(args.trace)
+			if RUN_LOG is not None :
+				RUN_LOG.close()
+		print("Process number : " + str(NB_PROCESS))
+		print("Bytes written : " + str(BYTES_WRITTEN))
+		if TRACER is not None :
+			TRACER.print_summary()
+		sys.exit(0)
 	
 	# process the data
-	spbyfile = reduce_all_files(spbyfile, cmdargs)
+	SCHEDULER = Scheduler(cmdargs, cmdargs.jobs, args.listen)
+	try :
+		# checks the desired output on the whole input and sets the timeout of the tests from its duration
+		cmdargs.timeout = args.timeout
+		cmdargs.timeout_desired = args.timeout_desired
+		(verdict, duration) = run_baseline(spbyfile, cmdargs)
+		if not verdict :
+			print("Warning : the desired output is not obtained with the whole input.")
+		if cmdargs.timeout is None :
+			cmdargs.timeout = max(TIMEOUT_MIN, args.timeout_factor * duration)
+		if cmdargs.verbose :
+			print(" - Timeout of the tests : " + str(round(cmdargs.timeout, 3)) + " seconds\n")
+
+		spbyfile = reduce_all_files(spbyfile, cmdargs)
+		SCHEDULER.close() # the speculative tests left are not needed
+		
+		# writes the reduced seqs in files in a new directory, unless they are simulated
+		if cmdargs.model is None or cmdargs.model.genome is None :
+			resultdir = "Results"
+			rmtree(resultdir, ignore_errors=True)
+			Path(resultdir).mkdir()
+			sp_to_files(spbyfile, cmdargs, resultdir)
 	
-	resultdir = "Results"
-	rmtree(resultdir, ignore_errors=True)
-	Path(resultdir).mkdir()
+	# the log replayed does not have the verdict of a configuration needed
+	except ModelError as e :
+		exit_error(str(e))
 	
-	# writes the reduced seqs in files in a new directory
-	sp_to_files(spbyfile, cmdargs, resultdir)
+	finally :
+		if not SCHEDULER.closed :
+			SCHEDULER.close()
+		WORKDIRS.clear()
+		if TRACER is not None :
+			TRACER.write(args.trace)
+		if RUN_LOG is not None :
+			RUN_LOG.close()
 	
 	print("Process number : " + str(NB_PROCESS))
+	print("Bytes written : " + str(BYTES_WRITTEN))
+	print("Cached outcomes used : " + str(OUTCOME_CACHE.hits))
+	if cmdargs.model is not None :
+		print(cmdargs.model.summary())
+		print("Critical path : " + str(path_depth()) + " tests")
+	if TRACER is not None :
+		TRACER.print_summary()
 	print_debug(spbyfile)
 	if args.verbose :
 		#print("\n", resultdir, " : ", sep="")
@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+from e1 import parsing
+from e1 import no_three_same_letters
+
+
+# runs like e1.py, but hangs when the input has three times three same following nucleotides if the second argument is "hang-error",
+# or when it has not if the second argument is "hang-done", to test the timeouts
+# with "child-done", it ends when it has not, but leaves a child holding its outputs
+if __name__ == '__main__' :
+    filename = sys.argv[1]
+    sequences = parsing(filename)
+    try :
+        no_three_same_letters(sequences)
+    except Exception :
+        if sys.argv[2] == "hang-error" :
+            time.sleep(60)
+        raise
+    if sys.argv[2] == "hang-done" :
+        time.sleep(60)
+    if sys.argv[2] == "child-done" and os.fork() == 0 :
+        time.sleep(60)
+        os._exit(0)
+    print("Done.")
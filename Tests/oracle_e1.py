@@ -0,0 +1,12 @@
+from e1 import parsing
+from e1 import no_three_same_letters
+
+
+# oracle of e1.py called in the process of minimise.py with --oracle
+# returns True if the file has three times three same following nucleotides
+def three_times_three_same(filename) :
+    try :
+        no_three_same_letters(parsing(filename))
+    except Exception :
+        return True
+    return False